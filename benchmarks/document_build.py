@@ -0,0 +1,79 @@
+"""
+Compare the cost of building Document and CompactDocument objects and instances of a model class.
+
+Runs without a database: documents are built from in-memory dicts the same way Driver.find builds them.
+
+python -m benchmarks.document_build --documents 20000 --fields 50
+"""
+import argparse
+import dataclasses
+import time
+import tracemalloc
+from bson import ObjectId
+from mongodriver.mongodriver import Document, CompactDocument
+from mongodriver.models import ModelAdapter
+
+
+def make_rows(documents: int, fields: int) -> list:
+    rows = []
+    for i in range(documents):
+        row = {"_id": ObjectId()}
+        for f in range(fields):
+            row[f"field_{f}"] = f"value {i}" if f % 2 else i * f
+        rows.append(row)
+    return rows
+
+
+def model_builder(fields: int):
+    """
+    A builder for a dataclass declaring every field of the rows, built the way Driver(model=...) builds it.
+    """
+    model = dataclasses.make_dataclass("Row", ["_id"] + [f"field_{f}" for f in range(fields)])
+    adapter = ModelAdapter(model)
+    return lambda _id, row, client: adapter.build(row)
+
+
+def build(document_class, rows: list, read_one: bool) -> list:
+    built = []
+    for row in rows:
+        document = document_class(str(row["_id"]), row, None)
+        if read_one:
+            document.field_1
+        built.append(document)
+    return built
+
+
+def measure(document_class, documents: int, fields: int, read_one: bool) -> tuple[float, float]:
+    rows = make_rows(documents, fields)
+    start = time.perf_counter()
+    build(document_class, rows, read_one)
+    elapsed = time.perf_counter() - start
+
+    rows = make_rows(documents, fields)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build(document_class, rows, read_one)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del built
+    return elapsed / documents * 1e6, (after - before) / documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20_000)
+    parser.add_argument("--fields", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.documents} documents with {args.fields} fields each\n")
+    print(f"{'class':<16}{'access':<14}{'build us/doc':>14}{'bytes/doc':>12}")
+    builders = {"Document": Document, "CompactDocument": CompactDocument, "model": model_builder(args.fields)}
+    for name, document_class in builders.items():
+        for read_one in (False, True):
+            per_doc, memory = measure(document_class, args.documents, args.fields, read_one)
+            access = "one field" if read_one else "none"
+            print(f"{name:<16}{access:<14}{per_doc:>14.2f}{memory:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
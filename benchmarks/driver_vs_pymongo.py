@@ -0,0 +1,204 @@
+"""
+Compare mongodriver with raw pymongo on the hot paths: create, bulk insert, find, load, attribute update, set,
+remove and Document construction, for several document counts and sizes.
+
+Runs offline against an in-process fake collection by default, or against a local mongod with --url.
+Each operation is timed one call at a time and reported as ops/sec and p50/p99 latency, then run again under
+tracemalloc for its peak memory. The x pymongo column is the mongodriver p50 divided by the pymongo p50.
+
+python -m benchmarks.driver_vs_pymongo --counts 1000 10000 --fields 10 100
+python -m benchmarks.driver_vs_pymongo --url mongodb://localhost:27017 --json results.json
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+import pymongo
+from mongodriver import Driver
+from mongodriver.utils import chunked
+from .fake_collection import FakeClient
+
+DB_NAME = "mongodriver_benchmark"
+# documents per group, so a find on a group returns this many documents
+GROUP_SIZE = 10
+
+Case = Tuple[str, int, Callable[[int], Any]]
+
+
+def make_rows(count: int, fields: int) -> List[dict]:
+    rows = []
+    for i in range(count):
+        row = {"group": i // GROUP_SIZE}
+        for f in range(fields):
+            row[f"field_{f}"] = f"value {i}" if f % 2 else i * f
+        rows.append(row)
+    return rows
+
+
+def pymongo_cases(client: Any, rows: List[dict], args: argparse.Namespace) -> Iterator[Case]:
+    """
+    The operations done with pymongo. The code between the cases prepares the next one and is not measured.
+    """
+    collection = client[DB_NAME]["pymongo"]
+    bulk_collection = client[DB_NAME]["pymongo_bulk"]
+    groups = max(len(rows) // GROUP_SIZE, 1)
+    ids = []
+    yield "create", len(rows), lambda i: ids.append(collection.insert_one(dict(rows[i])).inserted_id)
+    chunks = list(chunked(rows, args.chunk_size))
+    yield "bulk insert", len(chunks), lambda i: bulk_collection.insert_many([dict(row) for row in chunks[i]])
+    yield "find", args.finds, lambda i: list(collection.find({"group": i % groups}))
+    yield "load", args.loads, lambda i: list(collection.find({}))
+    decoded = list(collection.find({}))
+    yield "build", len(decoded), lambda i: dict(decoded[i])
+    yield "attribute update", len(ids), lambda i: collection.update_one(
+        {"_id": ids[i]}, {"$set": {"field_0": -i - 1}}
+    )
+    yield "set", len(ids), lambda i: collection.update_one({"_id": ids[i]}, {"$set": {"extra": i}})
+    yield "remove", len(ids), lambda i: collection.delete_one({"_id": ids[i]})
+
+
+def mongodriver_cases(client: Any, rows: List[dict], args: argparse.Namespace) -> Iterator[Case]:
+    """
+    The same operations done with mongodriver.
+    """
+    driver = Driver("benchmark", DB_NAME, "mongodriver", mongo_client=client)
+    bulk_driver = Driver("benchmark", DB_NAME, "mongodriver_bulk", mongo_client=client)
+    groups = max(len(rows) // GROUP_SIZE, 1)
+    documents = []
+    yield "create", len(rows), lambda i: documents.append(driver.create(dict(rows[i])))
+    chunks = list(chunked(rows, args.chunk_size))
+    yield "bulk insert", len(chunks), lambda i: bulk_driver.create_many(
+        [dict(row) for row in chunks[i]], chunk_size=args.chunk_size
+    )
+    yield "find", args.finds, lambda i: driver.find({"group": i % groups})
+    yield "load", args.loads, lambda i: driver.load()
+    decoded = list(driver.client.find({}))
+    yield "build", len(decoded), lambda i: driver._make_document(dict(decoded[i]))
+    yield "attribute update", len(documents), lambda i: setattr(documents[i], "field_0", -i - 1)
+    yield "set", len(documents), lambda i: documents[i].set({"extra": i})
+    yield "remove", len(documents), lambda i: documents[i].remove()
+
+
+def time_cases(cases: Iterator[Case]) -> Dict[str, List[float]]:
+    """
+    The latency of every call of each case, in seconds.
+    """
+    latencies = {}
+    for name, operations, run in cases:
+        timings = []
+        for i in range(operations):
+            start = time.perf_counter()
+            run(i)
+            timings.append(time.perf_counter() - start)
+        latencies[name] = timings
+    return latencies
+
+
+def trace_cases(cases: Iterator[Case]) -> Dict[str, int]:
+    """
+    The peak memory allocated while each case runs, in bytes.
+    """
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for name, operations, run in cases:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            for i in range(operations):
+                run(i)
+            peaks[name] = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def percentile(timings: List[float], percent: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def connect(url: str | None) -> Any:
+    if url is None:
+        return FakeClient()
+    client = pymongo.MongoClient(url)
+    client.drop_database(DB_NAME)
+    for name in ("pymongo", "mongodriver"):
+        client[DB_NAME][name].create_index("group")
+    return client
+
+
+def benchmark(library: str, cases: Callable[..., Iterator[Case]], rows: List[dict], args) -> List[dict]:
+    client = connect(args.url)
+    try:
+        latencies = time_cases(cases(client, rows, args))
+    finally:
+        client.close()
+    client = connect(args.url)
+    try:
+        peaks = trace_cases(cases(client, rows, args))
+    finally:
+        if args.url is not None:
+            client.drop_database(DB_NAME)
+        client.close()
+    results = []
+    for name, timings in latencies.items():
+        total = sum(timings)
+        results.append({
+            "operation": name,
+            "library": library,
+            "operations": len(timings),
+            "ops_per_sec": len(timings) / total if total else None,
+            "p50_us": percentile(timings, 50) * 1e6 if timings else None,
+            "p99_us": percentile(timings, 99) * 1e6 if timings else None,
+            "peak_bytes": peaks[name],
+        })
+    return results
+
+
+def print_results(results: List[dict]):
+    print(f"{'operation':<18}{'library':<13}{'ops/sec':>12}{'p50 us':>10}{'p99 us':>10}{'peak KiB':>11}{'x pymongo':>11}")
+    baseline = {result["operation"]: result for result in results if result["library"] == "pymongo"}
+    for operation in baseline:
+        for result in results:
+            if result["operation"] != operation:
+                continue
+            ratio = ""
+            if result["library"] != "pymongo" and baseline[operation]["p50_us"]:
+                ratio = f"{result['p50_us'] / baseline[operation]['p50_us']:.2f}"
+            print(
+                f"{operation if result['library'] == 'pymongo' else '':<18}{result['library']:<13}"
+                f"{result['ops_per_sec'] or 0:>12.0f}{result['p50_us'] or 0:>10.1f}{result['p99_us'] or 0:>10.1f}"
+                f"{result['peak_bytes'] / 1024:>11.0f}{ratio:>11}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[1_000, 10_000], help="documents per run")
+    parser.add_argument("--fields", type=int, nargs="+", default=[10, 100], help="fields per document")
+    parser.add_argument("--url", default=None, help="a local mongod to use instead of the in-process fake")
+    parser.add_argument("--finds", type=int, default=200, help="find calls per run")
+    parser.add_argument("--loads", type=int, default=5, help="load calls per run")
+    parser.add_argument("--chunk-size", type=int, default=100, help="documents per bulk insert call")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args()
+
+    print(f"against {args.url or 'the in-process fake collection'}\n")
+    everything = []
+    for count in args.counts:
+        for fields in args.fields:
+            rows = make_rows(count, fields)
+            results = benchmark("pymongo", pymongo_cases, rows, args)
+            results += benchmark("mongodriver", mongodriver_cases, rows, args)
+            print(f"{count} documents with {fields} fields each")
+            print_results(results)
+            print()
+            everything += [dict(result, documents=count, fields=fields) for result in results]
+    if args.json is not None:
+        with open(args.json, "w") as file:
+            json.dump(everything, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
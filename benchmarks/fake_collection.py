@@ -0,0 +1,190 @@
+"""
+An in-process stand-in for a MongoClient, so the benchmarks run without a server.
+
+Documents are stored as BSON and decoded on every read, and updates re-encode the document, so the per-document
+codec work a server round trip costs is still paid. Only what the benchmarks use is supported: equality filters on
+top-level keys, {"_id": {"$in": [...]}}, and the $set, $unset and $inc update operators.
+"""
+import copy
+from typing import Any, Dict, Iterator, List
+import bson
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.results import DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+
+def _matches(document: dict, search_terms: dict) -> bool:
+    for key, condition in search_terms.items():
+        if isinstance(condition, dict):
+            if set(condition) != {"$in"}:
+                raise NotImplementedError(f"unsupported filter {condition!r}")
+            if document.get(key) not in condition["$in"]:
+                return False
+        elif document.get(key) != condition:
+            return False
+    return True
+
+
+def _apply(document: dict, update: dict):
+    for operator, values in update.items():
+        if operator == "$set":
+            document.update(copy.deepcopy(values))
+        elif operator == "$unset":
+            for key in values:
+                document.pop(key, None)
+        elif operator == "$inc":
+            for key, amount in values.items():
+                document[key] = document.get(key, 0) + amount
+        else:
+            raise NotImplementedError(f"unsupported update operator {operator}")
+
+
+def _project(document: dict, projection: dict | None) -> dict:
+    if not projection:
+        return document
+    if any(projection.values()):
+        return {key: value for key, value in document.items() if key == "_id" or projection.get(key)}
+    return {key: value for key, value in document.items() if key not in projection}
+
+
+class FakeCursor:
+    def __init__(self, rows: List[bytes], projection: dict | None):
+        self._rows = rows
+        self._projection = projection
+
+    def __iter__(self) -> Iterator[dict]:
+        for row in self._rows:
+            yield _project(bson.decode(row), self._projection)
+
+    def close(self):
+        self._rows = []
+
+
+class FakeCollection:
+    def __init__(self, database: str, name: str):
+        self.name = name
+        self.full_name = f"{database}.{name}"
+        # the decoded documents are kept next to their BSON to match filters without decoding
+        self._documents: Dict[Any, dict] = {}
+        self._encoded: Dict[Any, bytes] = {}
+
+    def with_options(self, **options) -> "FakeCollection":
+        return self
+
+    def drop(self):
+        self._documents.clear()
+        self._encoded.clear()
+
+    def _store(self, document: dict):
+        self._documents[document["_id"]] = document
+        self._encoded[document["_id"]] = bson.encode(document)
+
+    def _matching(self, search_terms: dict) -> Iterator[Any]:
+        doc_id = search_terms.get("_id")
+        if doc_id is not None and not isinstance(doc_id, dict):
+            # lookups by _id are served like the _id index would
+            if doc_id in self._documents and _matches(self._documents[doc_id], search_terms):
+                yield doc_id
+            return
+        for key, document in list(self._documents.items()):
+            if _matches(document, search_terms):
+                yield key
+
+    def insert_one(self, document: dict) -> InsertOneResult:
+        document.setdefault("_id", ObjectId())
+        self._store(copy.deepcopy(document))
+        return InsertOneResult(document["_id"], True)
+
+    def insert_many(self, documents: List[dict], ordered: bool = True) -> InsertManyResult:
+        for document in documents:
+            document.setdefault("_id", ObjectId())
+            self._store(copy.deepcopy(document))
+        return InsertManyResult([document["_id"] for document in documents], True)
+
+    def find(
+            self,
+            search_terms: dict | None = None,
+            projection: dict | None = None,
+            sort: Any = None,
+            limit: int = 0,
+            batch_size: int = 0,
+    ) -> FakeCursor:
+        if sort:
+            raise NotImplementedError("sort is not supported")
+        keys = list(self._matching(search_terms or {}))
+        if limit:
+            keys = keys[:limit]
+        return FakeCursor([self._encoded[key] for key in keys], projection)
+
+    def find_one(self, search_terms: dict | None = None, projection: dict | None = None) -> dict | None:
+        for key in self._matching(search_terms or {}):
+            return _project(bson.decode(self._encoded[key]), projection)
+        return None
+
+    def update_one(self, search_terms: dict, update: dict) -> UpdateResult:
+        for key in self._matching(search_terms):
+            _apply(self._documents[key], update)
+            self._store(self._documents[key])
+            return UpdateResult({"n": 1, "nModified": 1}, True)
+        return UpdateResult({"n": 0, "nModified": 0}, True)
+
+    def update_many(self, search_terms: dict, update: dict) -> UpdateResult:
+        keys = list(self._matching(search_terms))
+        for key in keys:
+            _apply(self._documents[key], update)
+            self._store(self._documents[key])
+        return UpdateResult({"n": len(keys), "nModified": len(keys)}, True)
+
+    def find_one_and_update(
+            self,
+            search_terms: dict,
+            update: dict,
+            projection: dict | None = None,
+            sort: Any = None,
+            return_document: bool = ReturnDocument.BEFORE,
+    ) -> dict | None:
+        for key in self._matching(search_terms):
+            before = bson.decode(self._encoded[key])
+            _apply(self._documents[key], update)
+            self._store(self._documents[key])
+            after = bson.decode(self._encoded[key])
+            return _project(after if return_document == ReturnDocument.AFTER else before, projection)
+        return None
+
+    def delete_one(self, search_terms: dict) -> DeleteResult:
+        for key in self._matching(search_terms):
+            del self._documents[key]
+            del self._encoded[key]
+            return DeleteResult({"n": 1}, True)
+        return DeleteResult({"n": 0}, True)
+
+    def delete_many(self, search_terms: dict) -> DeleteResult:
+        keys = list(self._matching(search_terms))
+        for key in keys:
+            del self._documents[key]
+            del self._encoded[key]
+        return DeleteResult({"n": len(keys)}, True)
+
+
+class FakeDatabase:
+    def __init__(self, name: str):
+        self.name = name
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(self.name, name)
+        return self._collections[name]
+
+
+class FakeClient:
+    def __init__(self):
+        self._databases: Dict[str, FakeDatabase] = {}
+
+    def __getitem__(self, name: str) -> FakeDatabase:
+        if name not in self._databases:
+            self._databases[name] = FakeDatabase(name)
+        return self._databases[name]
+
+    def close(self):
+        pass
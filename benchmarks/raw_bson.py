@@ -0,0 +1,92 @@
+"""
+Compare the CPU time and memory of reading documents with full decoding and with the raw_bson lazy decoding mode.
+
+Runs without a database: a synthetic collection is encoded to BSON once, and each mode decodes it the way
+the driver decodes the batches sent by the server, then builds Documents and reads some of their fields.
+
+python -m benchmarks.raw_bson --documents 100000 --fields 30 --read 2
+"""
+import argparse
+import time
+import tracemalloc
+import bson
+from bson import ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from mongodriver.mongodriver import Document, CompactDocument
+from mongodriver.raw import RawVariables, raw_id
+
+RAW_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+
+def make_batch(documents: int, fields: int) -> bytes:
+    rows = []
+    for i in range(documents):
+        row = {"_id": ObjectId()}
+        for f in range(fields):
+            if f % 3 == 0:
+                row[f"field_{f}"] = i * f
+            elif f % 3 == 1:
+                row[f"field_{f}"] = f"value {i}"
+            else:
+                row[f"field_{f}"] = {"nested": [i, f], "label": f"label {f}"}
+        rows.append(bson.encode(row))
+    return b"".join(rows)
+
+
+def build_decoded(document_class, batch: bytes, read: int) -> list:
+    built = []
+    for row in bson.decode_all(batch):
+        document = document_class(str(row["_id"]), row, None)
+        for f in range(read):
+            getattr(document, f"field_{f}")
+        built.append(document)
+    return built
+
+
+def build_raw(batch: bytes, read: int) -> list:
+    built = []
+    for row in bson.decode_all(batch, RAW_OPTIONS):
+        document = CompactDocument(str(raw_id(row)), RawVariables(row.raw), None)
+        for f in range(read):
+            getattr(document, f"field_{f}")
+        built.append(document)
+    return built
+
+
+def measure(build, batch: bytes, documents: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    build(batch)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    built = build(batch)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del built
+    return elapsed / documents * 1e6, peak / documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--fields", type=int, default=30)
+    parser.add_argument("--read", type=int, default=2, help="fields read from each document")
+    args = parser.parse_args()
+
+    batch = make_batch(args.documents, args.fields)
+    modes = {
+        "Document": lambda data: build_decoded(Document, data, args.read),
+        "CompactDocument": lambda data: build_decoded(CompactDocument, data, args.read),
+        "raw_bson": lambda data: build_raw(data, args.read),
+    }
+
+    print(f"{args.documents} documents with {args.fields} fields each, {args.read} read per document\n")
+    print(f"{'mode':<18}{'us/doc':>10}{'peak bytes/doc':>16}")
+    for name, build in modes.items():
+        per_doc, memory = measure(build, batch, args.documents)
+        print(f"{name:<18}{per_doc:>10.2f}{memory:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
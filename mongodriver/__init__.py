@@ -1,3 +1,9 @@
-from .mongodriver import Driver, Document, Variable
+from .mongodriver import Driver, Document, CompactDocument, Variable
+from .session import Session
+from .indexes import Index, CollectionScanError, CollectionScanWarning
+from .instrumentation import Instrumentation, OperationRecord
+from .aggregation import Pipeline
+from .pool import close_clients
 from .async_mongodriver import Driver as AsyncDriver, Document as AsyncDocument, Variable as AsyncVariable
+from .async_mongodriver import close_clients as close_async_clients
 __version__ = "1.3.4"
@@ -0,0 +1,168 @@
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+# stages after which results are not documents of the collection anymore, even if they have an _id:
+# grouped or bucketed results, replaced roots, documents of other collections, and unwound copies of one document
+RESHAPING_STAGES = {
+    "$group", "$bucket", "$bucketAuto", "$sortByCount", "$count", "$facet", "$replaceRoot", "$replaceWith",
+    "$unionWith", "$unwind",
+}
+# stages that write their results to a collection
+WRITING_STAGES = {"$out", "$merge"}
+
+
+class Pipeline:
+    """
+    A fluent builder of an aggregation pipeline. Every stage method appends a stage and returns the pipeline.
+
+    driver.aggregate().match({"status": "paid"}).group("$customer", total={"$sum": "$amount"}).sort({"total": -1})
+    """
+
+    def __init__(
+            self,
+            stages: List[dict] | None = None,
+            allow_disk_use: bool = False,
+            batch_size: int = 0,
+            documents: bool = True,
+    ):
+        self.stages: List[dict] = list(stages or [])
+        self.allow_disk_use = allow_disk_use
+        self.batch_size = batch_size
+        self.documents = documents
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.stages!r})"
+
+    def stage(self, stage: dict) -> "Pipeline":
+        """
+        Append any stage, e.g. {"$sample": {"size": 10}}.
+        """
+        self.stages.append(stage)
+        return self
+
+    def match(self, search_terms: dict) -> "Pipeline":
+        return self.stage({"$match": search_terms})
+
+    def group(self, key: Any, **accumulators: dict) -> "Pipeline":
+        """
+        Group by key, e.g. "$customer" or {"year": {"$year": "$created"}}, with accumulators such as
+        total={"$sum": "$amount"}. The key is the _id of the results.
+        """
+        return self.stage({"$group": {"_id": key, **accumulators}})
+
+    def lookup(
+            self,
+            from_collection: str,
+            local_field: str | None = None,
+            foreign_field: str | None = None,
+            as_field: str | None = None,
+            pipeline: "List[dict] | Pipeline | None" = None,
+            let: dict | None = None,
+    ) -> "Pipeline":
+        """
+        Join the documents of another collection of the same database into the array as_field,
+        by local_field and foreign_field, by a pipeline, or both.
+        """
+        if as_field is None:
+            raise ValueError("lookup needs as_field")
+        lookup: Dict[str, Any] = {"from": from_collection, "as": as_field}
+        if local_field is not None or foreign_field is not None:
+            lookup["localField"] = local_field
+            lookup["foreignField"] = foreign_field
+        if pipeline is not None:
+            lookup["pipeline"] = pipeline.stages if isinstance(pipeline, Pipeline) else pipeline
+        if let is not None:
+            lookup["let"] = let
+        return self.stage({"$lookup": lookup})
+
+    def project(self, projection: dict | List[str]) -> "Pipeline":
+        """
+        Keep or compute fields, e.g. {"total": 1, "year": {"$year": "$created"}} or ["total", "created"].
+        """
+        if not isinstance(projection, dict):
+            projection = {key: 1 for key in projection}
+        return self.stage({"$project": projection})
+
+    def add_fields(self, fields: dict) -> "Pipeline":
+        return self.stage({"$addFields": fields})
+
+    def unwind(self, path: str, preserve_null_and_empty_arrays: bool = False) -> "Pipeline":
+        path = path if path.startswith("$") else f"${path}"
+        if preserve_null_and_empty_arrays:
+            return self.stage({"$unwind": {"path": path, "preserveNullAndEmptyArrays": True}})
+        return self.stage({"$unwind": path})
+
+    def sort(self, sort: dict) -> "Pipeline":
+        return self.stage({"$sort": sort})
+
+    def skip(self, count: int) -> "Pipeline":
+        return self.stage({"$skip": count})
+
+    def limit(self, count: int) -> "Pipeline":
+        return self.stage({"$limit": count})
+
+    def count(self, field: str = "count") -> "Pipeline":
+        return self.stage({"$count": field})
+
+    def keeps_ids(self) -> bool:
+        """
+        Whether the results are still documents of the collection, so they can be returned as Documents.
+        """
+        return not any(key in RESHAPING_STAGES for stage in self.stages for key in stage)
+
+    def writes(self) -> bool:
+        """
+        Whether the pipeline ends with $out or $merge.
+        """
+        return bool(self.stages) and any(key in WRITING_STAGES for key in self.stages[-1])
+
+    def options(self) -> Dict[str, Any]:
+        """
+        The keyword arguments of Collection.aggregate.
+        """
+        options: Dict[str, Any] = {}
+        if self.allow_disk_use:
+            options["allowDiskUse"] = True
+        if self.batch_size:
+            options["batchSize"] = self.batch_size
+        return options
+
+
+class Aggregation(Pipeline):
+    """
+    A pipeline of a Driver. It runs on the server when it is iterated, and the results are streamed one cursor
+    batch at a time: Documents while the results are documents of the collection, plain dicts otherwise,
+    e.g. after a $group or $unwind or for results without _id.
+
+    for row in driver.aggregate(allow_disk_use=True).match({"status": "paid"}).group("$customer", n={"$sum": 1}):
+    """
+
+    def __init__(self, driver: Any, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._driver = driver
+
+    def __iter__(self) -> Iterator[Any]:
+        return self._driver._iter_aggregate(self)
+
+    def to_list(self) -> List[Any]:
+        """
+        Run the pipeline and return all its results.
+        """
+        return list(self)
+
+
+class AsyncAggregation(Pipeline):
+    """A PIPELINE OF AN AsyncDriver
+    async for row in driver.aggregate().match({"status": "paid"}).group("$customer", n={"$sum": 1}):
+    results are Documents while they are documents of the collection, plain dicts otherwise
+    """
+
+    def __init__(self, driver: Any, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._driver = driver
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._driver._iter_aggregate(self)
+
+    async def to_list(self) -> List[Any]:
+        """RUNS THE PIPELINE AND RETURNS ALL ITS RESULTS"""
+        return [row async for row in self]
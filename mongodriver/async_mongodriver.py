@@ -1,8 +1,41 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Any, List, Union, Dict
+from typing import Any, AsyncIterator, Callable, Iterable, List, Union, Dict
 from dataclasses import dataclass, field
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from pymongo.results import DeleteResult, UpdateResult
+from pymongo.write_concern import WriteConcern
+from .aggregation import AsyncAggregation
+from .instrumentation import Instrumentation, document_instrumentation, instrumented
+from .pagination import Page, encode_token, keyset_query
+from .pool import ClientRegistry, pool_options
+from .results import CreateManyResult, inserted_from_error
+from .transfer import export_collection, import_collection
+from .utils import chunked, diff_update, normalize_projection, update_keys
+from .watch import AsyncChangeWatcher, LiveDocuments, apply_change
+from .write_behind import WriteBehindQueue
 import asyncio
+import copy
+import functools
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+# a Motor client is bound to the event loop it is first used on, so clients are only shared within one loop
+clients = ClientRegistry(AsyncIOMotorClient, scope=_running_loop)
+# keeps fire-and-forget writes alive until they finish
+_background_tasks = set()
+
+
+def close_clients():
+    """CLOSE EVERY SHARED CLIENT OF THE ASYNC DRIVER"""
+    clients.close()
 
 
 @dataclass
@@ -11,26 +44,72 @@ class Document:
     variables: dict
     client: AsyncIOMotorClient = field(repr=False)
     _initialized: bool = field(repr=False, default=False)
+    _driver: "Driver | None" = field(repr=False, default=None, compare=False)
+    _snapshot: dict | None = field(repr=False, default=None, compare=False)
 
     def __post_init__(self):
         if "_id" in self.variables.keys():
             self.variables.pop("_id")
         for variable in self.variables.keys():
-            class_value = Variable(
+            # straight into __dict__, so fields named like a method (set, save, ...) are not taken for writes
+            self.__dict__[variable] = Variable(
                 self._id, variable, self.variables[variable], self.client, self
             )
-            setattr(self, variable, class_value)
         self._initialized = True
 
+    @instrumented("document.write", document_instrumentation)
+    async def _write(self, update: dict, fetch: bool = False) -> dict | None:
+        """SENDS AN UPDATE FOR THIS DOCUMENT
+        queued attribute writes for the keys of a $set or $unset are older, so they are dropped first,
+        and queued writes that other operators build on are sent first
+        with fetch, the updated keys are returned as stored by the server
+        nothing is sent while changes are tracked, save() sends them
+        """
+        if self._snapshot is not None:
+            return None
+        if self._driver is not None:
+            if set(update) <= {"$set", "$unset"}:
+                await self._driver.write_queue.discard(self._id, update_keys(update))
+            else:
+                await self._driver.write_queue.flush_document(self._id)
+        if fetch:
+            return await self.client.find_one_and_update(
+                {"_id": ObjectId(self._id)},
+                update,
+                projection={key: 1 for key in update_keys(update)},
+                return_document=ReturnDocument.AFTER,
+            )
+        await self.client.update_one({"_id": ObjectId(self._id)}, update)
+        return None
+
+    def _queue_write(self, key: str, value: Any):
+        """QUEUES A WRITE ON THE DRIVER'S WRITE-BEHIND QUEUE AND UPDATES THE DOCUMENT RIGHT AWAY"""
+        update = {"$set": {key: value}}
+        if self._snapshot is not None:
+            # changes are tracked and sent by save()
+            pass
+        elif self._driver is not None:
+            self._driver.write_queue.put(self._id, update)
+        else:
+            # not created by a Driver, so there is no queue to use
+            task = asyncio.get_running_loop().create_task(
+                self.client.update_one({"_id": ObjectId(self._id)}, update)
+            )
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        self.variables[key] = value
+        var = self.__dict__.get(key)
+        if isinstance(var, Variable):
+            var.value = value
+        else:
+            self.__dict__[key] = Variable(self._id, key, value, self.client, self)
+
     async def set(self, new_values: dict):
         """ADDS NEW VARIABLES TO THE DOCUMENT"""
         # removing _id in case it was passed. Don't want to try and update that lol
         if "_id" in new_values.keys():
             new_values.pop("_id")
-        await self.client.find_one_and_update(
-            {"_id": ObjectId(self._id)},
-            {"$set": new_values},
-        )
+        await self._write({"$set": new_values})
         for variable in new_values.keys():
             class_value = Variable(
                 self._id, variable, new_values[variable], self.client, self
@@ -40,31 +119,74 @@ class Document:
             # setattr(self, variable, class_value)
             self.__dict__[variable] = class_value
 
+    @instrumented("document.save", document_instrumentation)
+    async def save(self) -> bool:
+        """SENDS THE CHANGES MADE SINCE THE DOCUMENT WAS LOADED OR LAST SAVED AS ONE UPDATE
+        only available for documents of a Driver created with track_changes=True
+        returns whether an update was sent
+        """
+        if self._snapshot is None:
+            raise ValueError("save() needs a Document of a Driver created with track_changes=True")
+        update = diff_update(self._snapshot, self.variables)
+        if update:
+            await self.client.update_one({"_id": ObjectId(self._id)}, update)
+        self._snapshot = copy.deepcopy(self.variables)
+        return bool(update)
+
+    @instrumented("document.fetch", document_instrumentation)
+    async def fetch(self, *keys: str) -> dict:
+        """FETCHES FIELDS THAT A PROJECTION LEFT OUT
+        document = await driver.find_one({"foo": 1}, projection=["foo"])
+        await document.fetch("bar", "baz")
+        attribute access cannot await, so unlike the sync Driver the fields are not fetched on first read
+        returns the fetched fields, fields the document does not have are left out
+        """
+        stored = await self.client.find_one({"_id": ObjectId(self._id)}, {key: 1 for key in keys})
+        fetched = {key: stored[key] for key in keys if stored is not None and key in stored}
+        for key, value in fetched.items():
+            self.variables[key] = value
+            if self._snapshot is not None:
+                self._snapshot[key] = copy.deepcopy(value)
+            self.__dict__[key] = Variable(self._id, key, value, self.client, self)
+        return fetched
+
+    @instrumented("document.remove", document_instrumentation)
     async def remove(self):
-       await self.client.find_one_and_delete({"_id": ObjectId(self._id)})
+        if self._driver is not None:
+            await self._driver.write_queue.discard(self._id)
+        await self.client.delete_one({"_id": ObjectId(self._id)})
 
     def asdict(self) -> dict:
         return self.variables
 
+    def _refresh_variable(self, key: str):
+        """REBUILDS THE Variable OF A KEY AFTER variables CHANGED"""
+        self.__dict__[key] = Variable(self._id, key, self.variables[key], self.client, self)
+
+    def _discard_variable(self, key: str):
+        self.__dict__.pop(key, None)
+
     def __setattr__(self, key, value):
         """UPDATE VARIABLES DIRECTLY
         Document.variable = 10
         instead of
-        Document.variable.update(10)
+        await Document.variable.update(10)
+        the write goes through the driver's write-behind queue, await Driver.flush() to send it right away
         """
+        if not self.__dict__.get("_initialized", False):
+            # object has not yet been initialized, so we are just updating the __dict__
+            self.__dict__[key] = value
+            return
         try:
             var = getattr(self, key)
-            if str(key) in self.variables.keys() and var != value:
-                var.update(value)
-            else:
-                self.__dict__[key] = value
-        except Exception:
-            if self._initialized:
-                # object has been initialized, so we are making a new variable
-                self.set({key: value})
-            else:
-                # object has not yet been initialized, so we are just updating the __dict__
-                self.__dict__[key] = value
+        except AttributeError:
+            # object has been initialized, so we are making a new variable
+            self._queue_write(key, value)
+            return
+        if str(key) in self.variables.keys() and var != value:
+            self._queue_write(key, value)
+        else:
+            self.__dict__[key] = value
 
 
 @dataclass
@@ -79,8 +201,7 @@ class Variable:
         return str(self.value)
 
     async def update(self, new_value: Any):
-        await self.client.find_one_and_update(
-            {"_id": ObjectId(self._id)},
+        await self.parent_document._write(
             {
                 "$set": {
                     self.key: new_value,
@@ -91,106 +212,550 @@ class Variable:
         self.parent_document.variables[self.key] = new_value
 
     async def remove(self):
-        await self.client.find_one_and_update(
-            {"_id": ObjectId(self._id)}, {"$unset": {self.key: ""}}
-        )
+        await self.parent_document._write({"$unset": {self.key: ""}})
         self.parent_document.variables.pop(self.key)
         self.parent_document.__dict__.pop(self.key)
 
+    async def _apply(self, operator: str, argument: Any, local_value: Any) -> Any:
+        """APPLIES AN UPDATE OPERATOR ON THE SERVER AND TAKES THE VALUE IT SENDS BACK"""
+        result = await self.parent_document._write({operator: {self.key: argument}}, fetch=True)
+        self.value = result[self.key] if result is not None and self.key in result else local_value
+        self.parent_document.variables[self.key] = self.value
+        return self.value
+
+    async def increment(self, amount: int | float = 1) -> Any:
+        """ATOMICALLY ADDS amount WITH $inc AND RETURNS THE NEW VALUE"""
+        return await self._apply("$inc", amount, (self.value or 0) + amount)
+
+    async def push(self, *values: Any) -> Any:
+        """ATOMICALLY APPENDS values WITH $push AND RETURNS THE NEW LIST"""
+        return await self._apply("$push", {"$each": list(values)}, list(self.value or []) + list(values))
+
+    async def add_to_set(self, *values: Any) -> Any:
+        """ATOMICALLY APPENDS THE values NOT IN THE LIST YET WITH $addToSet AND RETURNS THE NEW LIST"""
+        local_value = list(self.value or [])
+        for value in values:
+            if value not in local_value:
+                local_value.append(value)
+        return await self._apply("$addToSet", {"$each": list(values)}, local_value)
+
+    async def pull(self, condition: Any) -> Any:
+        """ATOMICALLY REMOVES THE ITEMS EQUAL TO OR MATCHING condition WITH $pull AND RETURNS THE NEW LIST"""
+        local_value = [value for value in (self.value or []) if value != condition]
+        return await self._apply("$pull", condition, local_value)
+
+    async def min(self, value: Any) -> Any:
+        """ATOMICALLY SETS THE VARIABLE TO value IF IT IS LOWER WITH $min AND RETURNS THE NEW VALUE"""
+        return await self._apply("$min", value, value if self.value is None else min(self.value, value))
+
+    async def max(self, value: Any) -> Any:
+        """ATOMICALLY SETS THE VARIABLE TO value IF IT IS HIGHER WITH $max AND RETURNS THE NEW VALUE"""
+        return await self._apply("$max", value, value if self.value is None else max(self.value, value))
+
 
 @dataclass
 class Driver:
     connection_url: str = field(repr=True)
     db_name: str = field(repr=True)
     collection_name: str = field(repr=True)
+    write_concern: WriteConcern | None = field(repr=False, default=None)
+    max_pool_size: int | None = field(repr=False, default=None)
+    min_pool_size: int | None = field(repr=False, default=None)
+    max_idle_time_ms: int | None = field(repr=False, default=None)
+    mongo_client: AsyncIOMotorClient | None = field(repr=False, default=None, compare=False)
+    write_batch_size: int = field(repr=False, default=1000)
+    write_interval: float = field(repr=False, default=0.1)
+    write_high_water_mark: int = field(repr=False, default=10_000)
+    track_changes: bool = field(repr=False, default=False)
+    instrumentation: Instrumentation | None = field(repr=False, default=None, compare=False)
 
     def __post_init__(self):
-        """CONNECT TO THE DB"""
-        self.client: AsyncIOMotorClient = AsyncIOMotorClient(self.connection_url)[self.db_name][
+        """CONNECT TO THE DB
+        every write uses write_concern when it is set, e.g. WriteConcern(w=0) to not wait for acknowledgement
+        drivers with the same connection url and pool settings share one client unless mongo_client is passed
+        attribute writes are merged on a write-behind queue and sent write_interval seconds later,
+        write_batch_size documents per bulk_write
+        with track_changes, documents take a snapshot when loaded and changes stay local until Document.save()
+        with instrumentation, every operation is recorded, see stats(); a client passed as mongo_client needs
+        event_listeners=[instrumentation] for round trips and commands to be recorded
+        """
+        self._shared_client = None
+        if self.mongo_client is None:
+            options = pool_options(self.max_pool_size, self.min_pool_size, self.max_idle_time_ms)
+            if self.instrumentation is not None:
+                options["event_listeners"] = [self.instrumentation]
+            self._shared_client = clients.get(self.connection_url, **options)
+        mongo_client = self.mongo_client or self._shared_client
+        self.client: AsyncIOMotorClient = mongo_client[self.db_name][
             self.collection_name
         ]
+        if self.write_concern is not None:
+            self.client = self.client.with_options(write_concern=self.write_concern)
+        self.write_queue = WriteBehindQueue(
+            self.client, self.write_batch_size, self.write_interval, self.write_high_water_mark
+        )
+        # the Documents handed out since watch() was first called
+        self._live: LiveDocuments | None = None
+
+    def watch(
+            self,
+            callback: Callable[[dict], Any] | None = None,
+            pipeline: List[dict] | None = None,
+            full_document: str | None = None,
+            source: Any = None,
+    ) -> AsyncChangeWatcher:
+        """FOLLOWS THE CHANGE STREAM OF THE COLLECTION IN A BACKGROUND TASK
+        async with driver.watch(callback) as watcher:
+        updates and replacements made by anyone are applied in place to the Documents handed out since watch()
+        was first called, then callback (a function or a coroutine function) is called with the change event
+        source replaces the change stream, e.g. with a list of events for tests, or a function that is given
+        the resume token and opens the stream
+        must be called from a running event loop
+        """
+        if self._live is None:
+            self._live = LiveDocuments()
+        if source is None:
+            def source(resume_token: Any) -> Any:
+                return self.client.watch(
+                    pipeline, full_document=full_document, resume_after=resume_token, max_await_time_ms=500
+                )
+        elif not callable(source):
+            events = source
+            source = lambda resume_token: events
+        return AsyncChangeWatcher(source, self._apply_change, [callback] if callback is not None else []).start()
+
+    def _apply_change(self, event: dict):
+        """APPLIES A CHANGE EVENT TO THE LIVE Document OBJECTS WITH ITS _id"""
+        doc_id = event.get("documentKey", {}).get("_id")
+        if doc_id is None or event.get("operationType") == "delete":
+            return
+        for document in self._live.get(doc_id):
+            changed = apply_change(document.variables, event)
+            if document._snapshot is not None:
+                apply_change(document._snapshot, event)
+            for key in changed:
+                if key in document.variables:
+                    document._refresh_variable(key)
+                else:
+                    document._discard_variable(key)
 
+    def stats(self) -> Dict[str, Any]:
+        """THE OPERATIONS AND COMMANDS RECORDED BY THE INSTRUMENTATION OF THE DRIVER
+        both are empty without instrumentation
+        """
+        if self.instrumentation is None:
+            return {"operations": {}, "commands": {}}
+        return self.instrumentation.stats()
+
+    async def wait_for_capacity(self):
+        """WAITS UNTIL THE WRITE-BEHIND QUEUE IS BELOW write_high_water_mark, DRAINING IT IF NEEDED
+        attribute assignment cannot await, so loops that assign attributes should await this to slow down
+        the async reads and writes of the driver await it too
+        """
+        if self.write_queue.over_high_water_mark:
+            await self.write_queue.wait_for_capacity()
+
+    @instrumented("flush")
+    async def flush(self):
+        """SENDS EVERY QUEUED ATTRIBUTE WRITE NOW"""
+        return await self.write_queue.flush()
+
+    def close(self):
+        """STOP USING THE SHARED CLIENT, IT IS CLOSED ONCE NO OTHER DRIVER USES IT
+        queued attribute writes are dropped, await Driver.flush() first
+        """
+        self.write_queue.close()
+        if self._shared_client is not None:
+            clients.release(self._shared_client)
+            self._shared_client = None
+
+    @instrumented("create")
     async def create(self, data: dict) -> Document:
         """CREATE A DOCUMENT FROM A DICT AND RETURN THE Document OBJECT"""
+        await self.wait_for_capacity()
         document = await self.client.insert_one(data)
-        python_document = Document(document.inserted_id, data, self.client)
+        python_document = self._make_document(data, document.inserted_id)
         return python_document
 
+    @instrumented("create_many")
+    async def create_many(
+            self,
+            data: Iterable[dict],
+            chunk_size: int = 1000,
+            ordered: bool = False,
+            return_documents: bool = True,
+            max_in_flight: int = 4,
+    ) -> CreateManyResult:
+        """CREATE MANY DOCUMENTS THROUGH CHUNKED insert_many CALLS, WITH AT MOST max_in_flight CHUNKS RUNNING AT ONCE
+        ordered inserts run one chunk at a time and stop at the first failing chunk
+        errors other than BulkWriteError stop the inserts and are raised once the running chunks finished
+        """
+        await self.wait_for_capacity()
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if ordered:
+            max_in_flight = 1
+        semaphore = asyncio.Semaphore(max_in_flight)
+        result = CreateManyResult(documents=[] if return_documents else None)
+        # what each chunk inserted, by chunk index, so the result keeps input order while chunks finish out of order
+        inserted_ids: Dict[int, List[ObjectId]] = {}
+        documents: Dict[int, List[Document]] = {}
+        # any other error, e.g. AutoReconnect, stops reading the input and is raised once the running chunks finish
+        failures: List[Exception] = []
+
+        async def insert_chunk(index: int, chunk: List[dict]):
+            try:
+                try:
+                    await self.client.insert_many(chunk, ordered=ordered)
+                    inserted = chunk
+                except BulkWriteError as error:
+                    result.errors[index] = error
+                    inserted = inserted_from_error(chunk, error, ordered)
+                inserted_ids[index] = [document["_id"] for document in inserted]
+                if return_documents:
+                    documents[index] = [self._make_document(document, document["_id"]) for document in inserted]
+            except Exception as error:
+                failures.append(error)
+            finally:
+                semaphore.release()
+
+        running = set()
+        for index, chunk in enumerate(chunked(data, chunk_size)):
+            # wait for a free slot before reading the next chunk, so at most max_in_flight chunks are held
+            await semaphore.acquire()
+            if failures or (ordered and result.errors):
+                semaphore.release()
+                break
+            task = asyncio.create_task(insert_chunk(index, chunk))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        await asyncio.gather(*running)
+        if failures:
+            raise failures[0]
+
+        for index in sorted(inserted_ids):
+            result.inserted_ids.extend(inserted_ids[index])
+            if return_documents:
+                result.documents.extend(documents[index])
+        return result
+
+    @instrumented("update")
     async def update(
             self, data: dict | Document, new_values: dict, sort: dict = None
-    ) -> Document:
+    ) -> Document | None:
+        """UPDATE A DOCUMENT WITH NEW VALUES
+        with a dict, the first document matching it is updated and returned, None if no document matched
+        queued attribute writes are sent first when data is a dict, since they may touch the matching document
+        """
+        await self.wait_for_capacity()
         if "_id" in new_values.keys():
             new_values.pop("_id")
         if isinstance(data, Document):
-            if sort is not None:
-                sort = sort.items()
-            await self.client.find_one_and_update(
-                filter={"_id": ObjectId(data._id)},
-                update={"$set": new_values},
-                sort=sort,
-                return_document=True,
-            )
-            for _, (key, value) in enumerate(new_values.items()):
-                class_value = Variable(data._id, key, value, self.client, data)
-
-                data.variables[key] = new_values[key]
-                # setattr(self, variable, class_value)
-                data.__dict__[key] = class_value
+            if data._snapshot is None:
+                await data._write({"$set": new_values})
+            else:
+                # an explicit update is sent even while changes are tracked
+                await self.client.update_one({"_id": ObjectId(data._id)}, {"$set": new_values})
+            self._set_locally(data, new_values)
             return data
         else:
-            if "_id" in data.keys() and not isinstance(data["_id"], ObjectId):
-                data["_id"] = ObjectId(data["_id"])
+            # queued attribute writes may touch the matching document, so they are sent first and cannot land after this
+            await self.write_queue.flush()
+            self._object_id_filter(data)
             document = await self.client.find_one_and_update(
                 filter=data,
-                update={"$set": update},
-                sort=sort.items(),
-                return_document=True,
+                update={"$set": new_values},
+                sort=list(sort.items()) if sort is not None else None,
+                return_document=ReturnDocument.AFTER,
             )
-            return Document(document.inserted_id, data, self.client)
+            if document is None:
+                return None
+            return self._make_document(document)
 
-    async def remove(self, data: dict | Document):
-        if isinstance(data, Document):
-            await self.client.find_one_and_delete({"_id": ObjectId(data._id)})
-        else:
-            if "_id" in data.keys() and not isinstance(data["_id"], ObjectId):
-                data["_id"] = ObjectId(data["_id"])
-            await self.client.find_one_and_delete(data)
-
-    async def load(self) -> List[Document]:
-        """LOADS ALL DOCUMENTS FROM DB INTO Document CLASSES"""
-        documents = await self.client.find({})
-        loaded_documents = []
-        for document in documents:
-            doc_id = document["_id"]
-            document.pop("_id")
-            python_document = Document(str(doc_id), document, self.client)
-            loaded_documents.append(python_document)
-        return loaded_documents
-
-    async def find(self, search_terms: dict) -> List[Document]:
-        """FIND A DOCUMENT AND RETURN IT AS A Document CLASS"""
-        if "_id" in search_terms.keys() and not isinstance(
-                search_terms["_id"], ObjectId
-        ):
-            search_terms["_id"] = ObjectId(search_terms["_id"])
-        processed_documents = []
-        documents = await self.client.find(search_terms)
-        for document in documents:
-            doc_id = str(document["_id"])
-            python_document = Document(doc_id, document, self.client)
-            processed_documents.append(python_document)
-        return processed_documents
-
-    async def find_one(self, search_terms: dict) -> Document | None:
-        if "_id" in search_terms.keys() and not isinstance(
-                search_terms["_id"], ObjectId
-        ):
+    @staticmethod
+    def _set_locally(document: Document, new_values: dict):
+        """GIVES A Document THE VALUES OF A $set THAT HAS BEEN SENT FOR IT"""
+        for key, value in new_values.items():
+            document.variables[key] = value
+            document.__dict__[key] = Variable(document._id, key, value, document.client, document)
+            if document._snapshot is not None:
+                document._snapshot[key] = copy.deepcopy(value)
+
+    @staticmethod
+    def _object_id_filter(search_terms: dict) -> dict:
+        """CONVERTS A STRING _id IN THE SEARCH TERMS INTO AN ObjectId, IN PLACE
+        operator expressions such as {"$in": [...]} are left as they are
+        """
+        if "_id" in search_terms.keys() and not isinstance(search_terms["_id"], (ObjectId, dict)):
             search_terms["_id"] = ObjectId(search_terms["_id"])
-        document = await self.client.find_one(search_terms)
+        return search_terms
+
+    async def _many_filter(self, data: dict | Iterable[Document]) -> tuple[dict, List[Document] | None]:
+        """BUILDS THE FILTER OF update_many OR remove_many
+        queued attribute writes are sent first when the filter is a dict, since they may touch matching documents
+        """
+        if isinstance(data, dict):
+            await self.write_queue.flush()
+            self._object_id_filter(data)
+            return data, None
+        documents = list(data)
+        return {"_id": {"$in": [ObjectId(document._id) for document in documents]}}, documents
+
+    @instrumented("update_many")
+    async def update_many(self, data: dict | Iterable[Document], new_values: dict) -> UpdateResult:
+        """UPDATE EVERY MATCHING DOCUMENT WITH ONE update_many CALL
+        await driver.update_many({"status": "trial"}, {"status": "expired"})
+        await driver.update_many(documents, {"archived": True})
+        a list of Documents becomes one {"_id": {"$in": [...]}} filter and the Documents get the new values
+        returns the UpdateResult, with matched_count and modified_count
+        """
+        await self.wait_for_capacity()
+        if "_id" in new_values.keys():
+            new_values.pop("_id")
+        search_terms, documents = await self._many_filter(data)
+        for document in documents or ():
+            # queued writes of these keys are older than this update
+            await self.write_queue.discard(document._id, new_values.keys())
+        result = await self.client.update_many(search_terms, {"$set": new_values})
+        for document in documents or ():
+            self._set_locally(document, new_values)
+        return result
+
+    @instrumented("remove_many")
+    async def remove_many(self, data: dict | Iterable[Document]) -> DeleteResult:
+        """REMOVE EVERY MATCHING DOCUMENT WITH ONE delete_many CALL
+        a list of Documents becomes one {"_id": {"$in": [...]}} filter
+        returns the DeleteResult, with deleted_count
+        """
+        await self.wait_for_capacity()
+        search_terms, documents = await self._many_filter(data)
+        for document in documents or ():
+            await self.write_queue.discard(document._id)
+        return await self.client.delete_many(search_terms)
+
+    @instrumented("remove")
+    async def remove(self, data: dict | Document, return_document: bool = False) -> Document | None:
+        """REMOVE A DOCUMENT
+        the removed document is only sent back by the server and returned when return_document is set
+        queued attribute writes are sent first when data is a dict, like for update
+        """
+        await self.wait_for_capacity()
+        if isinstance(data, Document):
+            await data.remove()
+            return None
+        await self.write_queue.flush()
+        self._object_id_filter(data)
+        if not return_document:
+            await self.client.delete_one(data)
+            return None
+        document = await self.client.find_one_and_delete(data)
+        if document is None:
+            return None
+        return self._make_document(document)
+
+    @instrumented("load")
+    async def load(
+            self, length: int | None = None, projection: dict | List[str] | None = None
+    ) -> List[Document]:
+        """LOADS ALL DOCUMENTS FROM DB INTO Document CLASSES
+        at most length documents are loaded when length is set
+        """
+        return await self.find({}, length, projection=projection)
+
+    def iter_load(
+            self, batch_size: int = 0, projection: dict | List[str] | None = None
+    ) -> AsyncIterator[Document]:
+        """STREAMS ALL DOCUMENTS FROM DB AS Document CLASSES
+        async for document in driver.iter_load(batch_size=500):
+        """
+        return self.iter_find({}, batch_size=batch_size, projection=projection)
+
+    @instrumented("find")
+    async def find(
+            self, search_terms: dict, length: int | None = None, projection: dict | List[str] | None = None
+    ) -> List[Document]:
+        """FIND DOCUMENTS AND RETURN THEM AS Document CLASSES
+        at most length documents are returned when length is set
+        projection is e.g. {"foo": 1}, {"blob": 0} or ["foo"], it cannot exclude _id
+        fields it left out can be loaded later with await Document.fetch(...)
+        """
+        await self.wait_for_capacity()
+        projection = normalize_projection(projection)
+        self._object_id_filter(search_terms)
+        return await self._cursor_to_list(self.client.find(search_terms, projection), length)
+
+    def iter_find(
+            self,
+            search_terms: dict,
+            batch_size: int = 0,
+            projection: dict | List[str] | None = None,
+            sort: dict | None = None,
+            limit: int = 0,
+    ) -> AsyncIterator[Document]:
+        """FIND DOCUMENTS AND STREAM THEM AS Document CLASSES WHILE THE CURSOR IS READ
+        async for document in driver.iter_find({"foo": 1}, batch_size=500):
+        the cursor is closed when the loop ends or the generator is closed
+        """
+        projection = normalize_projection(projection)
+        self._object_id_filter(search_terms)
+        cursor = self.client.find(
+            search_terms,
+            projection=projection,
+            sort=list(sort.items()) if sort is not None else None,
+            limit=limit,
+            batch_size=batch_size,
+        )
+        documents = self._iter_cursor(cursor)
+        if self.instrumentation is not None:
+            return self.instrumentation.astream("iter_find", documents)
+        return documents
+
+    def aggregate(
+            self,
+            pipeline: List[dict] | None = None,
+            allow_disk_use: bool = False,
+            batch_size: int = 0,
+            documents: bool = True,
+    ) -> AsyncAggregation:
+        """STARTS AN AGGREGATION PIPELINE THAT RUNS ON THE SERVER
+        rows = await driver.aggregate(allow_disk_use=True).match({"status": "paid"}).group(
+            "$customer_id", total={"$sum": "$amount"}).sort({"total": -1}).to_list()
+        async for row in driver.aggregate().match({"status": "paid"}).lookup("customers", "customer_id", "_id", "customer"):
+        results are streamed as Documents while they are documents of the collection, as plain dicts once a stage
+        reshapes them ($group, $unwind, $replaceRoot, ...) or when they have no _id, or always without documents
+        """
+        return AsyncAggregation(self, pipeline, allow_disk_use, batch_size, documents)
+
+    def _iter_aggregate(self, aggregation: AsyncAggregation) -> AsyncIterator[Document | dict]:
+        """RUNS AN AGGREGATION AND STREAMS ITS RESULTS"""
+        if aggregation.stages and "$match" in aggregation.stages[0]:
+            search_terms = aggregation.stages[0]["$match"]
+            self._object_id_filter(search_terms)
+        cursor = self.client.aggregate(aggregation.stages, **aggregation.options())
+        rows = self._iter_aggregate_cursor(cursor, aggregation.documents and aggregation.keeps_ids())
+        if self.instrumentation is not None:
+            return self.instrumentation.astream("aggregate", rows)
+        return rows
+
+    async def _iter_aggregate_cursor(self, cursor, documents: bool) -> AsyncIterator[Document | dict]:
+        try:
+            async for row in cursor:
+                yield self._make_document(row) if documents and "_id" in row else row
+        finally:
+            await cursor.close()
+
+    @instrumented("paginate")
+    async def paginate(
+            self,
+            search_terms: dict,
+            page_size: int,
+            sort_key: str = "_id",
+            after: str | None = None,
+            descending: bool = False,
+    ) -> Page:
+        """GETS ONE PAGE OF DOCUMENTS SORTED BY sort_key AND THEN _id
+        page = await driver.paginate({"foo": 1}, 100, sort_key="created")
+        next_page = await driver.paginate({"foo": 1}, 100, sort_key="created", after=page.next_token)
+        pages continue with a range filter instead of skipping documents, so deep pages are as cheap as the first
+        """
+        await self.wait_for_capacity()
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        self._object_id_filter(search_terms)
+        query, sort = keyset_query(search_terms, sort_key, after, descending)
+        cursor = self.client.find(query, sort=sort, limit=page_size + 1)
+        try:
+            rows = await cursor.to_list(page_size + 1)
+        finally:
+            await cursor.close()
+        page = Page()
+        if len(rows) > page_size:
+            page.next_token = encode_token(rows[page_size - 1], sort_key)
+        page.documents = [self._make_document(row) for row in rows[:page_size]]
+        return page
+
+    @instrumented("export")
+    async def export(
+            self,
+            path: str,
+            search_terms: dict | None = None,
+            format: str = "jsonl",
+            compress: bool = False,
+            batch_size: int = 1000,
+            resume: bool = False,
+    ) -> int:
+        """STREAMS THE MATCHING DOCUMENTS TO A FILE, ONE BATCH AT A TIME
+        await driver.export("users.jsonl.gz", {"active": True}, compress=True)
+        format is "jsonl" or "bson", resume continues from the checkpoint an interrupted export left next to the file
+        runs in a thread with the pymongo collection under the motor one, returns the number of documents in the file
+        """
+        if search_terms:
+            self._object_id_filter(search_terms)
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            export_collection, self.client.delegate, path, search_terms, format, compress, batch_size, resume
+        ))
+
+    @instrumented("import")
+    async def import_(
+            self,
+            path: str,
+            chunk_size: int = 1000,
+            workers: int = 4,
+            upsert: bool = False,
+            resume: bool = False,
+            format: str | None = None,
+    ) -> int:
+        """STREAMS A FILE WRITTEN BY export() INTO THE COLLECTION
+        await driver.import_("users.jsonl.gz", workers=8)
+        workers insert_many calls of chunk_size documents run at the same time, upsert replaces documents by _id
+        resume continues from the checkpoint an interrupted import left next to the file
+        returns the number of documents written by this call
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            import_collection, self.client.delegate, path, chunk_size, workers, upsert, resume, format
+        ))
+
+    async def _iter_cursor(self, cursor) -> AsyncIterator[Document]:
+        try:
+            async for document in cursor:
+                yield self._make_document(document)
+        finally:
+            await cursor.close()
+
+    async def _cursor_to_list(self, cursor, length: int | None) -> List[Document]:
+        try:
+            documents = await cursor.to_list(length)
+        finally:
+            await cursor.close()
+        return [self._make_document(document) for document in documents]
+
+    @instrumented("find_one")
+    async def find_one(
+            self, search_terms: dict, projection: dict | List[str] | None = None
+    ) -> Document | None:
+        await self.wait_for_capacity()
+        projection = normalize_projection(projection)
+        self._object_id_filter(search_terms)
+        document = await self.client.find_one(search_terms, projection)
         if document is None:
             return None
-        doc_id = str(document["_id"])
-        python_document = Document(doc_id, document, self.client)
+        return self._make_document(document)
+
+    def _make_document(self, document: dict, doc_id: str | ObjectId | None = None) -> Document:
+        """BUILDS A Document, TIMED WHEN THE DRIVER IS INSTRUMENTED"""
+        if self.instrumentation is not None:
+            return self.instrumentation.build(self._build_document, document, doc_id)
+        return self._build_document(document, doc_id)
+
+    def _build_document(self, document: dict, doc_id: str | ObjectId | None = None) -> Document:
+        """BUILDS A Document, WITH A SNAPSHOT IF CHANGES ARE TRACKED"""
+        if doc_id is None:
+            doc_id = str(document["_id"])
+        python_document = Document(doc_id, document, self.client, _driver=self)
+        if self.track_changes:
+            python_document._snapshot = copy.deepcopy(python_document.variables)
+        if self._live is not None:
+            self._live.add(python_document)
         return python_document
 
 
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+from dataclasses import dataclass, field
+
+_MISSING = object()
+
+
+@dataclass
+class DocumentCache:
+    """
+    A thread-safe LRU cache with an optional time to live, used as the Driver's identity map.
+    Entries past max_size are evicted least recently used first, and entries older than ttl seconds are dropped on access.
+    """
+    max_size: int = 1024
+    ttl: float | None = None
+    clock: Callable[[], float] = field(repr=False, default=time.monotonic)
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    evictions: int = field(default=0, init=False)
+    expirations: int = field(default=0, init=False)
+    clears: int = field(default=0, init=False)
+    _entries: "OrderedDict[Hashable, Tuple[float, Any]]" = field(repr=False, default_factory=OrderedDict, init=False)
+    _lock: threading.Lock = field(repr=False, default_factory=threading.Lock, init=False)
+
+    def __post_init__(self):
+        if self.max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry)
+
+    def _expired(self, entry: Tuple[float, Any]) -> bool:
+        return self.ttl is not None and self.clock() - entry[0] >= self.ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value and mark it as recently used.
+
+        Parameters:
+        key (Hashable): The key of the value.
+        default (Any, optional): Returned when the key is not cached or has expired.
+
+        Returns:
+        Any: The cached value, or default.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and self._expired(entry):
+                del self._entries[key]
+                self.expirations += 1
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Cache a value, evicting the least recently used entries if the cache is full.
+
+        Parameters:
+        key (Hashable): The key of the value.
+        value (Any): The value to cache.
+        """
+        with self._lock:
+            self._entries[key] = (self.clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove a value from the cache without counting a hit or a miss.
+
+        Parameters:
+        key (Hashable): The key of the value.
+        default (Any, optional): Returned when the key is not cached.
+
+        Returns:
+        Any: The removed value, or default.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[1]
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value without counting a hit or a miss or changing its position.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING or self._expired(entry):
+                return default
+            return entry[1]
+
+    def values(self) -> List[Any]:
+        """
+        The cached values that have not expired, least recently used first, without counting hits.
+        """
+        with self._lock:
+            return [entry[1] for entry in self._entries.values() if not self._expired(entry)]
+
+    def clear(self):
+        """
+        Remove every entry from the cache. The counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.clears += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+        Dict[str, int]: The hit, miss, eviction, expiration and clear counters and the current size of the cache.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "clears": self.clears,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
@@ -0,0 +1,145 @@
+import threading
+import warnings
+from typing import Any, Dict, Hashable, List, Tuple
+from dataclasses import dataclass
+import pymongo
+from pymongo import IndexModel
+
+
+class CollectionScanWarning(UserWarning):
+    """
+    Warned when a read or write of a Driver with detect_collscans="warn" is planned as a collection scan.
+    """
+
+
+class CollectionScanError(Exception):
+    """
+    Raised when a read or write of a Driver with detect_collscans="raise" is planned as a collection scan.
+    """
+
+
+@dataclass
+class Index:
+    """
+    The declaration of an index for Driver(indexes=[...]).
+
+    Index("email", unique=True)
+    Index([("user_id", pymongo.ASCENDING), ("created", pymongo.DESCENDING)])
+    Index("created", expire_after_seconds=3600)  # TTL index
+    Index("status", partial_filter={"status": {"$exists": True}})  # partial index
+    """
+    keys: str | List[Tuple[str, Any]] | Dict[str, Any]
+    name: str | None = None
+    unique: bool = False
+    sparse: bool = False
+    expire_after_seconds: int | None = None
+    partial_filter: dict | None = None
+
+    def key_list(self) -> List[Tuple[str, Any]]:
+        if isinstance(self.keys, str):
+            return [(self.keys, pymongo.ASCENDING)]
+        if isinstance(self.keys, dict):
+            return list(self.keys.items())
+        return [(key, direction) for key, direction in self.keys]
+
+    def index_model(self) -> IndexModel:
+        """
+        Returns:
+        IndexModel: The index as pymongo's create_indexes takes it.
+        """
+        options: Dict[str, Any] = {}
+        if self.name is not None:
+            options["name"] = self.name
+        if self.unique:
+            options["unique"] = True
+        if self.sparse:
+            options["sparse"] = True
+        if self.expire_after_seconds is not None:
+            options["expireAfterSeconds"] = self.expire_after_seconds
+        if self.partial_filter is not None:
+            options["partialFilterExpression"] = self.partial_filter
+        return IndexModel(self.key_list(), **options)
+
+
+def ensure_indexes(collection: Any, indexes: List[Index]) -> List[str]:
+    """
+    Create the declared indexes that do not exist yet. Indexes that already exist on the same keys are left alone,
+    so calling this again is cheap and does nothing.
+
+    Parameters:
+    collection (Any): The pymongo Collection.
+    indexes (List[Index]): The declared indexes.
+
+    Returns:
+    List[str]: The names of the indexes that were created.
+    """
+    existing = {
+        tuple((key, direction) for key, direction in information["key"])
+        for information in collection.index_information().values()
+    }
+    missing = [index.index_model() for index in indexes if tuple(index.key_list()) not in existing]
+    if not missing:
+        return []
+    return collection.create_indexes(missing)
+
+
+def filter_shape(value: Any) -> Hashable:
+    """
+    The shape of a filter: its keys and operators without the values, so {"age": {"$gt": 30}} and
+    {"age": {"$gt": 40}} share one query plan check.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, filter_shape(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(filter_shape(item) for item in value if isinstance(item, (dict, list, tuple)))
+    return None
+
+
+def _stages(plan: dict):
+    yield plan.get("stage")
+    if "queryPlan" in plan:
+        yield from _stages(plan["queryPlan"])
+    if "inputStage" in plan:
+        yield from _stages(plan["inputStage"])
+    for stage in plan.get("inputStages", ()):
+        yield from _stages(stage)
+
+
+class ScanDetector:
+    """
+    Explains the filters of a Driver's reads and writes, once per filter shape, and warns or raises when the
+    winning plan is a collection scan. Meant for development and staging: every new shape costs an explain round trip.
+    Empty filters are skipped, since they always read the whole collection on purpose.
+    """
+
+    def __init__(self, mode: str):
+        if mode not in ("warn", "raise"):
+            raise ValueError('detect_collscans must be "warn" or "raise"')
+        self.mode = mode
+        self.plans: Dict[Hashable, bool] = {}
+        self._lock = threading.Lock()
+
+    def check(self, collection: Any, search_terms: dict, sort: List[Tuple[str, Any]] | None = None):
+        """
+        Check the plan of a filter, explaining it if its shape was not seen yet.
+        """
+        if not search_terms:
+            return
+        shape = (filter_shape(search_terms), tuple(key for key, _ in sort) if sort else None)
+        with self._lock:
+            scans = self.plans.get(shape)
+        if scans is None:
+            explained = collection.find(search_terms, sort=sort).explain()
+            scans = "COLLSCAN" in _stages(explained.get("queryPlanner", {}).get("winningPlan", {}))
+            with self._lock:
+                first = shape not in self.plans
+                self.plans[shape] = scans
+        else:
+            first = False
+        if not scans:
+            return
+        message = f"{collection.full_name} filter {search_terms!r} is planned as a collection scan"
+        if self.mode == "raise":
+            raise CollectionScanError(message)
+        if first:
+            warnings.warn(message, CollectionScanWarning, stacklevel=4)
@@ -0,0 +1,357 @@
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List
+from dataclasses import dataclass, field
+import bson
+from pymongo import monitoring
+
+# upper bounds of the histogram buckets, in microseconds: 1us, 2us, 4us, ... about 67s, then everything above
+_BOUNDS = [2 ** power for power in range(27)]
+
+# the high-level operation running in the current thread or task, if any
+_current: contextvars.ContextVar["OperationRecord | None"] = contextvars.ContextVar("mongodriver_operation", default=None)
+
+
+class Histogram:
+    """
+    A latency histogram with power of two buckets, from 1 microsecond to about 67 seconds.
+    Percentiles are reported as the upper bound of the bucket they fall in.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def add(self, microseconds: float):
+        index = 0
+        while index < len(_BOUNDS) and microseconds > _BOUNDS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += microseconds
+        self.min = microseconds if self.min is None else min(self.min, microseconds)
+        self.max = microseconds if self.max is None else max(self.max, microseconds)
+
+    def percentile(self, percent: float) -> float | None:
+        """
+        The bucket upper bound below which percent of the values fall, in microseconds.
+        """
+        if not self.count:
+            return None
+        threshold = self.count * percent / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= threshold:
+                return float(_BOUNDS[index]) if index < len(_BOUNDS) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, float | int | None]:
+        """
+        Returns:
+        Dict[str, float | int | None]: The count, mean, min, max, p50, p90 and p99, in milliseconds.
+        """
+        def ms(value):
+            return None if value is None else value / 1000
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.total / self.count) if self.count else None,
+            "min_ms": ms(self.min),
+            "max_ms": ms(self.max),
+            "p50_ms": ms(self.percentile(50)),
+            "p90_ms": ms(self.percentile(90)),
+            "p99_ms": ms(self.percentile(99)),
+        }
+
+
+@dataclass
+class OperationRecord:
+    """
+    What one high-level call, e.g. Driver.find or an attribute write on a Document, cost.
+    Passed to the hooks of Instrumentation once the call returns.
+    """
+    name: str
+    seconds: float = 0.0
+    round_trips: int = 0
+    documents: int = 0
+    bytes: int = 0
+    build_seconds: float = 0.0
+    error: BaseException | None = field(repr=False, default=None)
+
+
+class OperationStats:
+    """
+    The totals of every call of one high-level operation.
+    """
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.errors = 0
+        self.round_trips = 0
+        self.documents = 0
+        self.bytes = 0
+        self.build_seconds = 0.0
+
+    def add(self, record: OperationRecord):
+        self.latency.add(record.seconds * 1e6)
+        self.errors += record.error is not None
+        self.round_trips += record.round_trips
+        self.documents += record.documents
+        self.bytes += record.bytes
+        self.build_seconds += record.build_seconds
+
+    def summary(self) -> Dict[str, Any]:
+        calls = self.latency.count
+        return {
+            "calls": calls,
+            "errors": self.errors,
+            "latency": self.latency.summary(),
+            "round_trips": self.round_trips,
+            "round_trips_per_call": self.round_trips / calls if calls else None,
+            "documents": self.documents,
+            "bytes": self.bytes,
+            "build_seconds": self.build_seconds,
+        }
+
+
+def _returned_documents(reply: Any) -> int:
+    cursor = reply.get("cursor") if isinstance(reply, dict) else None
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    if isinstance(reply, dict) and isinstance(reply.get("value"), dict):
+        # findAndModify
+        return 1
+    return 0
+
+
+class Instrumentation(monitoring.CommandListener):
+    """
+    Records what the operations of the Drivers it is given to cost. Built on pymongo's command monitoring:
+    the Driver registers it as an event listener of its client.
+
+    For every high-level operation (Driver.find, Driver.create, Document writes, ...) it records a latency histogram,
+    the number of server round trips, the documents and bytes the server returned, and the time spent building
+    Document objects. Every server command gets a latency histogram too. Hooks are called with the OperationRecord
+    of each operation.
+
+    instrumentation = Instrumentation()
+    driver = Driver(..., instrumentation=instrumentation)
+    instrumentation.add_hook(lambda record: print(record))
+    driver.stats()
+
+    count_bytes measures reply sizes by encoding every reply again, which costs some CPU on large reads.
+    """
+
+    def __init__(self, count_bytes: bool = True):
+        self.count_bytes = count_bytes
+        self.hooks: List[Callable[[OperationRecord], Any]] = []
+        self._operations: Dict[str, OperationStats] = {}
+        self._commands: Dict[str, Histogram] = {}
+        self._command_failures: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[OperationRecord], Any]) -> Callable[[OperationRecord], Any]:
+        """
+        Add a function called with the OperationRecord of every operation. Can be used as a decorator.
+        """
+        self.hooks.append(hook)
+        return hook
+
+    # pymongo command listener
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        record = _current.get()
+        if record is not None:
+            record.round_trips += 1
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        record = _current.get()
+        if record is not None:
+            record.documents += _returned_documents(event.reply)
+            if self.count_bytes:
+                record.bytes += len(bson.encode(event.reply))
+        with self._lock:
+            self._commands.setdefault(event.command_name, Histogram()).add(event.duration_micros)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        with self._lock:
+            self._commands.setdefault(event.command_name, Histogram()).add(event.duration_micros)
+            self._command_failures[event.command_name] = self._command_failures.get(event.command_name, 0) + 1
+
+    # high-level operations
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[OperationRecord]:
+        """
+        Record a high-level operation. Operations started inside another one are counted as part of the outer one.
+        """
+        outer = _current.get()
+        if outer is not None:
+            yield outer
+            return
+        record = OperationRecord(name)
+        token = _current.set(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as error:
+            record.error = error
+            raise
+        finally:
+            record.seconds = time.perf_counter() - start
+            _current.reset(token)
+            self._finish(record)
+
+    @contextmanager
+    def resume(self, record: OperationRecord) -> Iterator[OperationRecord]:
+        """
+        Make a record current again, e.g. while a streaming read fetches its next batch.
+        """
+        token = _current.set(record)
+        try:
+            yield record
+        finally:
+            _current.reset(token)
+
+    def stream(self, name: str, iterator: Iterator[Any]) -> Iterator[Any]:
+        """
+        Record a streaming read, e.g. Driver.iter_find, as one operation that ends when the iterator does.
+        Only the time spent getting the next item is counted, not the time the caller spends between items.
+        Inside another operation, e.g. Driver.find, the items are passed through and count towards that operation.
+        """
+        if _current.get() is not None:
+            yield from iterator
+            return
+        record = OperationRecord(name)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    with self.resume(record):
+                        item = next(iterator)
+                except StopIteration:
+                    return
+                except Exception as error:
+                    record.error = error
+                    raise
+                finally:
+                    record.seconds += time.perf_counter() - start
+                yield item
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+            self._finish(record)
+
+    async def astream(self, name: str, iterator: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """
+        The async version of stream(), for AsyncDriver.iter_find.
+        """
+        if _current.get() is not None:
+            async for item in iterator:
+                yield item
+            return
+        record = OperationRecord(name)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    with self.resume(record):
+                        item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+                except Exception as error:
+                    record.error = error
+                    raise
+                finally:
+                    record.seconds += time.perf_counter() - start
+                yield item
+        finally:
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
+            self._finish(record)
+
+    def _finish(self, record: OperationRecord):
+        with self._lock:
+            self._operations.setdefault(record.name, OperationStats()).add(record)
+        for hook in self.hooks:
+            hook(record)
+
+    def build(self, build: Callable[..., Any], *args: Any) -> Any:
+        """
+        Build a Document and add the time it took to the current operation.
+        """
+        start = time.perf_counter()
+        document = build(*args)
+        record = _current.get()
+        if record is not None:
+            record.build_seconds += time.perf_counter() - start
+        return document
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+        Dict[str, Any]: A snapshot of the operation and command statistics.
+        """
+        with self._lock:
+            return {
+                "operations": {name: stats.summary() for name, stats in self._operations.items()},
+                "commands": {
+                    name: dict(histogram.summary(), failures=self._command_failures.get(name, 0))
+                    for name, histogram in self._commands.items()
+                },
+            }
+
+    def reset(self):
+        """
+        Forget every recorded operation and command.
+        """
+        with self._lock:
+            self._operations.clear()
+            self._commands.clear()
+            self._command_failures.clear()
+
+
+def _own_instrumentation(owner: Any) -> Instrumentation | None:
+    return owner.instrumentation
+
+
+def document_instrumentation(document: Any) -> Instrumentation | None:
+    driver = document._driver
+    return driver.instrumentation if driver is not None else None
+
+
+def instrumented(name: str, source: Callable[[Any], Instrumentation | None] = _own_instrumentation):
+    """
+    Record every call of a method as the high-level operation name, when its object has instrumentation.
+    Without instrumentation the method is called straight away.
+
+    Parameters:
+    name (str): The name of the operation in stats().
+    source (Callable[[Any], Instrumentation | None], optional): Gets the Instrumentation from the object.
+    """
+    def decorate(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def wrapper(self, *args, **kwargs):
+                instrumentation = source(self)
+                if instrumentation is None:
+                    return await method(self, *args, **kwargs)
+                with instrumentation.operation(name):
+                    return await method(self, *args, **kwargs)
+        else:
+            @functools.wraps(method)
+            def wrapper(self, *args, **kwargs):
+                instrumentation = source(self)
+                if instrumentation is None:
+                    return method(self, *args, **kwargs)
+                with instrumentation.operation(name):
+                    return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,137 @@
+import copy
+import dataclasses
+import functools
+from typing import Any, Dict, Tuple
+from .utils import diff_update
+
+
+def _slot_names(model: type) -> Tuple[str, ...]:
+    names = []
+    for cls in reversed(model.__mro__):
+        slots = cls.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        names.extend(name for name in slots if name not in ("__dict__", "__weakref__") and name not in names)
+    return tuple(names)
+
+
+def _restore_tracked(model: type, state: Dict[str, Any]) -> Any:
+    """
+    Rebuild a pickled instance of tracked_class(model).
+    """
+    cls = tracked_class(model)
+    instance = cls.__new__(cls)
+    for key, value in state.items():
+        object.__setattr__(instance, key, value)
+    return instance
+
+
+def _reduce_tracked(instance: Any, protocol: int = 2) -> tuple:
+    # the tracked class has the name of the model without being it, so pickle could not find it by name
+    state = dict(getattr(instance, "__dict__", {}))
+    for key in _slot_names(type(instance)):
+        try:
+            state[key] = getattr(instance, key)
+        except AttributeError:
+            pass
+    return _restore_tracked, (type(instance).__mro__[1], state)
+
+
+@functools.lru_cache(maxsize=None)
+def tracked_class(model: type) -> type:
+    """
+    The subclass of a model with an extra _snapshot slot that tracked instances are built from.
+    Its instances can be pickled, and are rebuilt from the same subclass.
+    """
+    return type(model.__name__, (model,), {
+        "__slots__": ("_snapshot",),
+        "__module__": model.__module__,
+        "__qualname__": model.__qualname__,
+        "__reduce_ex__": _reduce_tracked,
+    })
+
+
+class ModelAdapter:
+    """
+    Builds instances of a model class registered with Driver(model=...) from the documents returned by the database.
+
+    The model is either a dataclass, built by calling it with the fields it declares, or a class with __slots__,
+    built without calling __init__ by assigning each slot. Keys of a document that the model does not declare are
+    ignored. The model must declare an _id field, which holds the _id as stored, usually an ObjectId.
+
+    With track_changes, instances are built from a subclass of the model with an extra _snapshot slot,
+    so Driver.save() can send only what changed. Tracked instances can be pickled, e.g. by parallel_scan,
+    and keep their snapshot.
+    """
+
+    def __init__(self, model: type, track_changes: bool = False):
+        if dataclasses.is_dataclass(model):
+            self.fields = tuple(model_field.name for model_field in dataclasses.fields(model))
+            self._init_fields = frozenset(
+                model_field.name for model_field in dataclasses.fields(model) if model_field.init
+            )
+        elif "__slots__" in model.__dict__:
+            self.fields = _slot_names(model)
+            self._init_fields = None
+        else:
+            raise TypeError(f"model {model.__name__} must be a dataclass or a class with __slots__")
+        if "_id" not in self.fields:
+            raise TypeError(f"model {model.__name__} must declare an _id field")
+        self.model = model
+        self.track_changes = track_changes
+        self.cls = model
+        if track_changes:
+            self.cls = tracked_class(model)
+
+    def owns(self, instance: Any) -> bool:
+        return isinstance(instance, self.model)
+
+    def build(self, document: dict) -> Any:
+        """
+        Build a model instance from a document.
+
+        Parameters:
+        document (dict): The document as returned by the database.
+
+        Returns:
+        Any: The model instance.
+        """
+        if self._init_fields is not None:
+            instance = self.cls(**{key: value for key, value in document.items() if key in self._init_fields})
+        else:
+            instance = self.cls.__new__(self.cls)
+            for key in self.fields:
+                if key in document:
+                    object.__setattr__(instance, key, document[key])
+        if self.track_changes:
+            object.__setattr__(instance, "_snapshot", copy.deepcopy(self.values(instance)))
+        return instance
+
+    def values(self, instance: Any) -> Dict[str, Any]:
+        """
+        The fields of a model instance that are set, without _id.
+        """
+        values = {}
+        for key in self.fields:
+            if key == "_id":
+                continue
+            try:
+                values[key] = getattr(instance, key)
+            except AttributeError:
+                pass
+        return values
+
+    def changes(self, instance: Any) -> dict:
+        """
+        Build the update that turns the snapshot of a tracked instance into its current state.
+        """
+        snapshot = getattr(instance, "_snapshot", None)
+        if snapshot is None:
+            raise ValueError("save() needs a model instance of a Driver created with track_changes=True")
+        return diff_update(snapshot, self.values(instance))
+
+    def saved(self, instance: Any):
+        """
+        Mark the current state of a tracked instance as saved.
+        """
+        object.__setattr__(instance, "_snapshot", copy.deepcopy(self.values(instance)))
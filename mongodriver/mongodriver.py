@@ -1,32 +1,86 @@
+import copy
+import functools
 import pymongo
-from typing import Any, List, Union, Dict
-from dataclasses import dataclass, field
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, List, Union, Dict
+from dataclasses import dataclass, field, fields
 from bson import ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from pymongo.results import DeleteResult, UpdateResult
+from pymongo.write_concern import WriteConcern
+from .aggregation import Aggregation
+from .results import CreateManyResult, inserted_from_error
+from .cache import DocumentCache
+from .pool import clients, pool_options
+from .indexes import Index, ScanDetector, ensure_indexes
+from .instrumentation import Instrumentation, document_instrumentation, instrumented
+from .models import ModelAdapter
+from .pagination import Page, encode_token, keyset_query
+from .parallel import partition_filters, scan_partition
+from .raw import RawVariables, raw_id
+from .session import Session
+from .transfer import export_collection, import_collection
+from .utils import chunked, diff_update, fetch_update, normalize_projection, query_key
+from .watch import ChangeWatcher, LiveDocuments, apply_change
 
 
-@dataclass
-class Document:
-    _id: str = field(repr=True)
-    variables: dict
-    client: pymongo.collection.Collection = field(repr=False)
-    _initialized: bool = field(repr=False, default=False)
+_NOT_CACHED = object()
 
-    def __post_init__(self):
+
+class BaseDocument:
+    """
+    The methods shared by Document and CompactDocument.
+    Subclasses provide _id, variables, client and _driver. Variable objects are kept in the instance __dict__
+    by default; subclasses that store them elsewhere override _refresh_variable and _discard_variable.
+    """
+    __slots__ = ()
+
+    def _make_variable(self, key: str, value: Any) -> "Variable | StringVariable":
         """
-        Post-initialization method for the Document class.
-        Removes '_id' from variables if present and initializes Variable instances for each variable.
+        Wraps a value of this document in the matching Variable class.
         """
-        if "_id" in self.variables.keys():
-            self.variables.pop("_id")
-        for variable in self.variables.keys():
-            if isinstance(self.variables[variable], str):
-                class_value = StringVariable(variable, self.variables[variable], self.client, self)
-            else:
-                class_value = Variable(
-                    self._id, variable, self.variables[variable], self.client, self
-                )
-            setattr(self, variable, class_value)
-        self._initialized = True
+        if isinstance(value, str):
+            return StringVariable(key, value, self.client, self)
+        return Variable(self._id, key, value, self.client, self)
+
+    def _refresh_variable(self, key: str):
+        """
+        Called after variables[key] has been given a new value. Rebuilds the Variable of the key.
+        """
+        self.__dict__[key] = self._make_variable(key, self.variables[key])
+
+    def _discard_variable(self, key: str):
+        """
+        Called after key has been removed from variables. Drops the Variable of the key.
+        """
+        self.__dict__.pop(key, None)
+
+    @instrumented("document.write", document_instrumentation)
+    def _write(self, update: dict, fetch: bool = False) -> dict | None:
+        """
+        Sends an update for this document to the database, or records it on the driver's active session.
+
+        Parameters:
+        update (dict): A MongoDB update document, e.g. {"$set": {"foo": 1}}.
+        fetch (bool, optional): Whether to get back the new values of the updated keys.
+
+        Returns:
+        dict | None: The updated keys as stored by the server if fetch was set and the update was sent, otherwise None.
+        """
+        if self._snapshot is not None:
+            # changes are tracked and sent by save()
+            return None
+        if self._driver is not None:
+            return self._driver._write(self, update, fetch)
+        if fetch:
+            return fetch_update(self.client, self._id, update)
+        self.client.update_one({"_id": ObjectId(self._id)}, update)
+        return None
 
     def set(self, new_values: dict):
         """
@@ -38,24 +92,41 @@ class Document:
         # removing _id in case it was passed. Don't want to try and update that lol
         if "_id" in new_values.keys():
             new_values.pop("_id")
-        self.client.find_one_and_update(
-            {"_id": ObjectId(self._id)},
-            {"$set": new_values},
-        )
+        self._write({"$set": new_values})
         for variable in new_values.keys():
-            class_value = Variable(
-                self._id, variable, new_values[variable], self.client, self
-            )
-
             self.variables[variable] = new_values[variable]
-            # setattr(self, variable, class_value)
-            self.__dict__[variable] = class_value
+            self._refresh_variable(variable)
+
+    @instrumented("document.save", document_instrumentation)
+    def save(self) -> bool:
+        """
+        Sends the changes made since the document was loaded or last saved as one update with the smallest $set and
+        $unset that turn the snapshot into the current variables. Nothing is sent if nothing changed.
+        Only available for documents of a Driver created with track_changes=True.
+
+        Returns:
+        bool: Whether an update was sent.
+        """
+        if self._snapshot is None:
+            raise ValueError("save() needs a Document of a Driver created with track_changes=True")
+        update = diff_update(self._snapshot, self.variables)
+        if update:
+            if self._driver is not None:
+                self._driver._write(self, update)
+            else:
+                self.client.update_one({"_id": ObjectId(self._id)}, update)
+        self._snapshot = copy.deepcopy(self.variables)
+        return bool(update)
 
+    @instrumented("document.remove", document_instrumentation)
     def remove(self):
         """
         Removes the document from the database.
         """
-        self.client.find_one_and_delete({"_id": ObjectId(self._id)})
+        if self._driver is not None:
+            self._driver._delete(self)
+        else:
+            self.client.delete_one({"_id": ObjectId(self._id)})
 
     def asdict(self) -> dict:
         """
@@ -63,32 +134,146 @@ class Document:
 
         Returns:
         dict: A dictionary representation of the document's variables.
+            For documents of a raw_bson Driver, a new dict decoded from the whole document.
         """
+        if isinstance(self.variables, RawVariables):
+            return self.variables.decode()
         return self.variables
 
+
+@dataclass
+class Document(BaseDocument):
+    _id: str = field(repr=True)
+    variables: dict
+    client: pymongo.collection.Collection = field(repr=False)
+    _initialized: bool = field(repr=False, default=False)
+    _driver: "Driver | None" = field(repr=False, default=None, compare=False)
+    _snapshot: dict | None = field(repr=False, default=None, compare=False)
+    _fetch_group: "FetchGroup | None" = field(repr=False, default=None, compare=False)
+
+    def __post_init__(self):
+        """
+        Post-initialization method for the Document class.
+        Removes '_id' from variables if present and initializes Variable instances for each variable.
+        """
+        if "_id" in self.variables.keys():
+            self.variables.pop("_id")
+        for variable in self.variables.keys():
+            # straight into __dict__: going through __setattr__ would look the field up and fall back to __getattr__
+            self.__dict__[variable] = self._make_variable(variable, self.variables[variable])
+        self._initialized = True
+
+    def __getattr__(self, key):
+        # only called when normal lookup fails, e.g. for a field left out by a projection
+        group = self.__dict__.get("_fetch_group")
+        if group is not None and group.fetch(key):
+            if key in self.__dict__:
+                return self.__dict__[key]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {key!r}")
+
     def __setattr__(self, key, value):
         """UPDATE VARIABLES DIRECTLY
         Document.variable = 10
         instead of
         Document.variable.update(10)
         """
-        try:
-            var = getattr(self, key)
-            if str(key) in self.variables.keys() and var != value:
+        if not self.__dict__.get("_initialized", False):
+            # object has not yet been initialized, so we are just updating the __dict__
+            self.__dict__[key] = value
+            return
+        # looked up without getattr, which would fetch a field left out by a projection before it is overwritten
+        if key in self.variables and key in self.__dict__:
+            var = self.__dict__[key]
+            if var != value:
                 var.update(value)
             else:
                 self.__dict__[key] = value
-        except Exception:
-            if self._initialized:
-                # object has been initialized, so we are making a new variable
-                self.set({key: value})
-            else:
-                # object has not yet been initialized, so we are just updating the __dict__
-                self.__dict__[key] = value
+        elif key in self.__dict__ or hasattr(type(self), key):
+            self.__dict__[key] = value
+        else:
+            # object has been initialized, so we are making a new variable
+            self.set({key: value})
+
+
+class CompactDocument(BaseDocument):
+    """
+    A Document that keeps only the raw dict of its variables.
+    Variable objects are created the first time an attribute is read instead of one per key up front,
+    and __slots__ removes the per-instance __dict__.
+    """
+    __slots__ = ("_id", "variables", "client", "_driver", "_snapshot", "_fetch_group", "_variable_objects", "__weakref__")
+    _own_attributes = frozenset(__slots__)
+
+    def __init__(
+            self,
+            _id: str,
+            variables: dict,
+            client: pymongo.collection.Collection,
+            _initialized: bool = False,
+            _driver: "Driver | None" = None,
+            _snapshot: dict | None = None,
+            _fetch_group: "FetchGroup | None" = None,
+    ):
+        variables.pop("_id", None)
+        object.__setattr__(self, "_id", _id)
+        object.__setattr__(self, "variables", variables)
+        object.__setattr__(self, "client", client)
+        object.__setattr__(self, "_driver", _driver)
+        object.__setattr__(self, "_snapshot", _snapshot)
+        object.__setattr__(self, "_fetch_group", _fetch_group)
+        object.__setattr__(self, "_variable_objects", None)
+
+    def __repr__(self):
+        return f"CompactDocument(_id={self._id!r}, variables={self.variables!r})"
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self._id, self.variables, self.client) == (other._id, other.variables, other.client)
+
+    __hash__ = None
+
+    def __getattr__(self, key):
+        # only called when normal lookup fails, i.e. for variables of the document
+        if key in CompactDocument._own_attributes:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {key!r}")
+        if key not in self.variables and self._fetch_group is not None:
+            self._fetch_group.fetch(key)
+        if key not in self.variables:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {key!r}")
+        if self._variable_objects is None:
+            object.__setattr__(self, "_variable_objects", {})
+        var = self._variable_objects.get(key)
+        if var is None:
+            var = self._variable_objects[key] = self._make_variable(key, self.variables[key])
+        return var
+
+    def _refresh_variable(self, key: str):
+        if self._variable_objects is not None:
+            self._variable_objects.pop(key, None)
+
+    _discard_variable = _refresh_variable
+
+    def __setattr__(self, key, value):
+        """UPDATE VARIABLES DIRECTLY
+        CompactDocument.variable = 10
+        instead of
+        CompactDocument.variable.update(10)
+        """
+        if key in CompactDocument._own_attributes:
+            object.__setattr__(self, key, value)
+        elif key in self.variables:
+            if self._variable_objects is not None and self._variable_objects.get(key) is value:
+                # the variable was changed in place, e.g. by an augmented assignment
+                return
+            if self.variables[key] != value:
+                self.__getattr__(key).update(value)
+        else:
+            self.set({key: value})
 
 
 class StringVariable(str):
-    def __new__(cls, name: str, content, client: pymongo.collection.Collection | None = None, parent_document: Document | None = None):
+    def __new__(cls, name: str, content, client: pymongo.collection.Collection | None = None, parent_document: BaseDocument | None = None):
         # str is immutable, so use __new__ instead of __init__
         obj = super().__new__(cls, content)
         obj.client = client
@@ -97,25 +282,25 @@ class StringVariable(str):
         return obj
 
     def update(self, new_value: Any):
-        self.client.find_one_and_update(
-            {"_id": ObjectId(self.parent_document._id)},
-            {
-                "$set": {
-                    self.key: new_value,
-                }
-            },
-        )
-        return StringVariable(new_value, self.client, self.parent_document)
+        """
+        Updates the value of the variable in the database and the parent document.
+        Strings are immutable, so the parent document gets a new variable for the value.
+
+        Parameters:
+        new_value (Any): The new value to update the variable with.
+        """
+        self.parent_document._write({"$set": {self.key: new_value}})
+        self.parent_document.variables[self.key] = new_value
+        self.parent_document._refresh_variable(self.key)
+        return getattr(self.parent_document, self.key)
 
     def remove(self):
         """
         Removes the variable from the database and the parent document.
         """
-        self.client.find_one_and_update(
-            {"_id": ObjectId(self.parent_document._id)}, {"$unset": {self.key: ""}}
-        )
+        self.parent_document._write({"$unset": {self.key: ""}})
         self.parent_document.variables.pop(self.key)
-        self.parent_document.__dict__.pop(self.key)
+        self.parent_document._discard_variable(self.key)
 
 
 
@@ -125,7 +310,7 @@ class Variable:
     key: str
     value: Any
     client: pymongo.collection.Collection = field(repr=False)
-    parent_document: Document = field(repr=False)
+    parent_document: BaseDocument = field(repr=False)
 
     def __repr__(self):
         return str(self.value)
@@ -137,14 +322,7 @@ class Variable:
        Parameters:
        new_value (Any): The new value to update the variable with.
        """
-        self.client.find_one_and_update(
-            {"_id": ObjectId(self._id)},
-            {
-                "$set": {
-                    self.key: new_value,
-                }
-            },
-        )
+        self.parent_document._write({"$set": {self.key: new_value}})
         self.value = new_value
         self.parent_document.variables[self.key] = new_value
 
@@ -152,11 +330,279 @@ class Variable:
         """
         Removes the variable from the database and the parent document.
         """
-        self.client.find_one_and_update(
-            {"_id": ObjectId(self._id)}, {"$unset": {self.key: ""}}
-        )
+        self.parent_document._write({"$unset": {self.key: ""}})
         self.parent_document.variables.pop(self.key)
-        self.parent_document.__dict__.pop(self.key)
+        self.parent_document._discard_variable(self.key)
+
+    def _apply(self, operator: str, argument: Any, local_value: Any) -> Any:
+        """
+        Applies an update operator to the variable on the server.
+        Once the write has returned, the variable takes the value the server sent back, or local_value if the update
+        was not sent, so a failed write leaves the variable unchanged.
+        """
+        result = self.parent_document._write({operator: {self.key: argument}}, fetch=True)
+        self.value = result[self.key] if result is not None and self.key in result else local_value
+        self.parent_document.variables[self.key] = self.value
+        return self.value
+
+    def increment(self, amount: int | float = 1) -> Any:
+        """
+        Atomically adds amount to the variable with $inc.
+
+        Parameters:
+        amount (int | float, optional): The amount to add. Can be negative.
+
+        Returns:
+        Any: The new value.
+        """
+        return self._apply("$inc", amount, (self.value or 0) + amount)
+
+    def push(self, *values: Any) -> Any:
+        """
+        Atomically appends values to the list with $push.
+
+        Returns:
+        Any: The new list.
+        """
+        return self._apply("$push", {"$each": list(values)}, list(self.value or []) + list(values))
+
+    def add_to_set(self, *values: Any) -> Any:
+        """
+        Atomically appends the values that are not in the list yet with $addToSet.
+
+        Returns:
+        Any: The new list.
+        """
+        local_value = list(self.value or [])
+        for value in values:
+            if value not in local_value:
+                local_value.append(value)
+        return self._apply("$addToSet", {"$each": list(values)}, local_value)
+
+    def pull(self, condition: Any) -> Any:
+        """
+        Atomically removes every item equal to, or matching, condition from the list with $pull.
+
+        Parameters:
+        condition (Any): A value, or a query condition such as {"$gte": 5}.
+
+        Returns:
+        Any: The new list.
+        """
+        local_value = [value for value in (self.value or []) if value != condition]
+        return self._apply("$pull", condition, local_value)
+
+    def min(self, value: Any) -> Any:
+        """
+        Atomically sets the variable to value if value is lower, with $min.
+
+        Returns:
+        Any: The new value.
+        """
+        return self._apply("$min", value, value if self.value is None else min(self.value, value))
+
+    def max(self, value: Any) -> Any:
+        """
+        Atomically sets the variable to value if value is higher, with $max.
+
+        Returns:
+        Any: The new value.
+        """
+        return self._apply("$max", value, value if self.value is None else max(self.value, value))
+
+    def __iadd__(self, other: Any):
+        """
+        Document.count += 1 is sent as $inc, and Document.items += [1, 2] as $push.
+        """
+        if isinstance(self.value, list):
+            self.push(*other)
+        else:
+            self.increment(other)
+        return self
+
+    def __isub__(self, other: int | float):
+        """
+        Document.count -= 1 is sent as $inc.
+        """
+        self.increment(-other)
+        return self
+
+    def __getitem__(self, key: Any) -> Any:
+        """
+        Items of a dict or list variable are returned as NestedVariable objects if they are dicts or lists themselves,
+        so changes deep inside the variable are sent as dotted-path updates:
+        Document.stats["daily"]["clicks"] = 5 sends {"$set": {"stats.daily.clicks": 5}}
+        """
+        return NestedVariable(self.parent_document, self.key, self.value)[key]
+
+    def __setitem__(self, key: Any, value: Any):
+        NestedVariable(self.parent_document, self.key, self.value)[key] = value
+
+    def __delitem__(self, key: Any):
+        del NestedVariable(self.parent_document, self.key, self.value)[key]
+
+
+class NestedVariable:
+    """
+    A dict or list inside a Document variable, found at a dotted path such as "stats.daily" or "items.3".
+    Changes are made to the document's local value in place and sent as updates of the smallest path that covers them.
+    """
+    __slots__ = ("parent_document", "path", "value")
+
+    def __init__(self, parent_document: BaseDocument, path: str, value: dict | list):
+        self.parent_document = parent_document
+        self.path = path
+        self.value = value
+
+    def _item_path(self, key: Any) -> str | None:
+        """
+        The dotted path of an item, or None if the key cannot be written as part of a path.
+        """
+        if isinstance(self.value, list):
+            if isinstance(key, slice):
+                return None
+            index = range(len(self.value))[key]
+            return f"{self.path}.{index}"
+        key = str(key)
+        if "." in key or key.startswith("$"):
+            return None
+        return f"{self.path}.{key}"
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self.value[key]
+        path = self._item_path(key)
+        if isinstance(value, (dict, list)) and path is not None:
+            return NestedVariable(self.parent_document, path, value)
+        return value
+
+    def __setitem__(self, key: Any, value: Any):
+        path = self._item_path(key)
+        self.value[key] = value
+        if path is None:
+            self.parent_document._write({"$set": {self.path: self.value}})
+        else:
+            self.parent_document._write({"$set": {path: value}})
+
+    def __delitem__(self, key: Any):
+        path = self._item_path(key)
+        del self.value[key]
+        if path is None or isinstance(self.value, list):
+            # array items cannot be removed by path, so the list is sent again
+            self.parent_document._write({"$set": {self.path: self.value}})
+        else:
+            self.parent_document._write({"$unset": {path: ""}})
+
+    def append(self, value: Any):
+        """
+        Appends value to a list with $push.
+        """
+        self.extend([value])
+
+    def extend(self, values: Iterable[Any]):
+        """
+        Appends values to a list with $push.
+        """
+        values = list(values)
+        self.value.extend(values)
+        self.parent_document._write({"$push": {self.path: {"$each": values}}})
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except (KeyError, IndexError):
+            return default
+
+    def keys(self):
+        return self.value.keys()
+
+    def items(self):
+        return [(key, self[key]) for key in self.value.keys()]
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self.value
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, NestedVariable):
+            other = other.value
+        return self.value == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+class FetchGroup:
+    """
+    The Documents returned by one projected read.
+    The first time a field left out by the projection is read from one of them, it is fetched for all of them
+    with a single query.
+    """
+
+    def __init__(self, client: pymongo.collection.Collection, projection: dict):
+        self.client = client
+        included = {key.split(".")[0] for key, value in projection.items() if value and key != "_id"}
+        # an inclusion projection leaves out everything else, an exclusion projection only what it names
+        self.included = included or None
+        self.excluded = {key.split(".")[0] for key, value in projection.items() if not value} if not included else set()
+        self.fetched = set()
+        self._documents: List[weakref.ReferenceType] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, document: BaseDocument):
+        document._fetch_group = self
+        self._documents.append(weakref.ref(document))
+
+    def left_out(self, key: str) -> bool:
+        """
+        Whether the projection may have left out a field.
+        """
+        if key.startswith("__") or key in self.fetched:
+            return False
+        if self.included is not None:
+            return key not in self.included
+        return key in self.excluded
+
+    def fetch(self, key: str) -> bool:
+        """
+        Fetch a field left out by the projection for every live Document of the group.
+
+        Parameters:
+        key (str): The name of the field.
+
+        Returns:
+        bool: Whether the field was fetched, whether or not the documents have it.
+        """
+        if not self.left_out(key):
+            return False
+        with self._lock:
+            if key in self.fetched:
+                return True
+            documents = {}
+            for reference in self._documents:
+                document = reference()
+                if document is not None:
+                    documents[ObjectId(document._id)] = document
+            for fetched in self.client.find({"_id": {"$in": list(documents)}}, {key: 1}):
+                document = documents.get(fetched["_id"])
+                if document is None or key not in fetched:
+                    continue
+                document.variables[key] = fetched[key]
+                if document._snapshot is not None:
+                    document._snapshot[key] = copy.deepcopy(fetched[key])
+                document._refresh_variable(key)
+            self.fetched.add(key)
+            self._documents = [reference for reference in self._documents if reference() is not None]
+        return True
 
 
 @dataclass
@@ -164,15 +610,280 @@ class Driver:
     connection_url: str = field(repr=True)
     db_name: str = field(repr=True)
     collection_name: str = field(repr=True)
+    cache_size: int = field(repr=False, default=0)
+    cache_ttl: float | None = field(repr=False, default=None)
+    compact: bool = field(repr=False, default=False)
+    write_concern: WriteConcern | None = field(repr=False, default=None)
+    max_pool_size: int | None = field(repr=False, default=None)
+    min_pool_size: int | None = field(repr=False, default=None)
+    max_idle_time_ms: int | None = field(repr=False, default=None)
+    mongo_client: pymongo.MongoClient | None = field(repr=False, default=None, compare=False)
+    track_changes: bool = field(repr=False, default=False)
+    raw_bson: bool = field(repr=False, default=False)
+    model: type | None = field(repr=False, default=None, compare=False)
+    query_cache_size: int = field(repr=False, default=0)
+    query_cache_ttl: float | None = field(repr=False, default=None)
+    indexes: List[Index] = field(repr=False, default_factory=list)
+    detect_collscans: str | None = field(repr=False, default=None)
+    instrumentation: Instrumentation | None = field(repr=False, default=None, compare=False)
 
     def __post_init__(self):
         """
         Connect to the MongoDB database using the provided connection URL, database name, and collection name.
+        If cache_size is set, find_one lookups by _id are served from an identity map of at most cache_size
+        Documents, each kept for at most cache_ttl seconds.
+        If compact is set, documents are returned as CompactDocument objects.
+        If write_concern is set, every write of this driver uses it, e.g. WriteConcern(w=0) to not wait for acknowledgement.
+
+        Drivers with the same connection URL and pool settings share one MongoClient from the client registry,
+        unless an existing client is passed as mongo_client.
+
+        If track_changes is set, Documents take a snapshot of themselves when they are loaded and changes made to them
+        stay local until Document.save() sends the difference.
+
+        If raw_bson is set, reads return the BSON bytes sent by the server and documents are CompactDocument objects
+        that decode a field the first time it is read. asdict() decodes the whole document.
+
+        If model is set, reads and creates return instances of that class instead of Documents. The model is a dataclass
+        or a class with __slots__ that declares an _id field. Assigning to an instance only changes it locally:
+        send changes with update(instance, new_values), or with save(instance) if track_changes is set.
+
+        If query_cache_size is set, the results of find, find_one and load are cached by filter, projection and sort,
+        for at most query_cache_size queries each kept for at most query_cache_ttl seconds. Every write made through
+        this driver or its Documents empties the cache. Writes made by other clients are only seen once the TTL expires.
+
+        If instrumentation is set, it is registered as a command listener of the client and records the latency,
+        round trips, returned documents and bytes, and Document build time of every operation, see stats().
+        A client passed as mongo_client must have been created with event_listeners=[instrumentation] for round trips
+        and commands to be recorded.
         """
-        self.client = pymongo.MongoClient(self.connection_url)[self.db_name][
+        self._shared_client = None
+        if self.mongo_client is None:
+            options = pool_options(self.max_pool_size, self.min_pool_size, self.max_idle_time_ms)
+            if self.instrumentation is not None:
+                options["event_listeners"] = [self.instrumentation]
+            self._shared_client = clients.get(self.connection_url, **options)
+        mongo_client = self.mongo_client or self._shared_client
+        self.client = mongo_client[self.db_name][
             self.collection_name
         ]
+        if self.write_concern is not None:
+            self.client = self.client.with_options(write_concern=self.write_concern)
+        self._read_client = self.client
+        if self.raw_bson:
+            self._read_client = self.client.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+        self._local = threading.local()
+        self._document_class = CompactDocument if self.compact or self.raw_bson else Document
+        self._model: ModelAdapter | None = None
+        if self.model is not None:
+            if self.raw_bson:
+                raise ValueError("model cannot be combined with raw_bson")
+            self._model = ModelAdapter(self.model, self.track_changes)
+        self.document_cache: DocumentCache | None = None
+        if self.cache_size > 0:
+            self.document_cache = DocumentCache(self.cache_size, self.cache_ttl)
+        self.query_cache: DocumentCache | None = None
+        # bumped by every write, so a read that raced a write does not cache its result
+        self._query_generation = 0
+        if self.query_cache_size > 0:
+            self.query_cache = DocumentCache(self.query_cache_size, self.query_cache_ttl)
+        # the Documents handed out since watch() was first called
+        self._live: LiveDocuments | None = None
+        self._scan_detector = ScanDetector(self.detect_collscans) if self.detect_collscans is not None else None
+
+    def ensure_indexes(self) -> List[str]:
+        """
+        Create the indexes declared with Driver(indexes=[...]) that do not exist yet.
+        Indexes that already exist on the same keys are left alone, so this can be called on every start.
+
+        Returns:
+        List[str]: The names of the indexes that were created.
+        """
+        return ensure_indexes(self.client, self.indexes)
+
+    def _check_plan(self, search_terms: dict, sort: List[Any] | None = None):
+        """
+        Warn or raise if detect_collscans is set and the filter is planned as a collection scan.
+        """
+        if self._scan_detector is not None:
+            self._scan_detector.check(self.client, search_terms, sort)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        The statistics of this driver: the operations and commands recorded by its instrumentation,
+        empty without instrumentation, and the counters of the identity map and query cache, None when not enabled.
+
+        Returns:
+        Dict[str, Any]: The keys operations, commands, document_cache and query_cache.
+        """
+        stats = self.instrumentation.stats() if self.instrumentation is not None else {"operations": {}, "commands": {}}
+        stats["document_cache"] = self.document_cache.stats() if self.document_cache is not None else None
+        stats["query_cache"] = self.query_cache.stats() if self.query_cache is not None else None
+        return stats
+
+    def close(self):
+        """
+        Stop using the shared MongoClient. It is closed once no other Driver uses it.
+        A client passed as mongo_client is left open.
+        """
+        if self._shared_client is not None:
+            clients.release(self._shared_client)
+            self._shared_client = None
 
+    @property
+    def active_session(self) -> Session | None:
+        """
+        The Session currently recording writes for this driver in the calling thread, if any.
+        """
+        return getattr(self._local, "session", None)
+
+    def session(self, ordered: bool = True, chunk_size: int = 1000) -> Session:
+        """
+        Start a unit of work. While the session is active, writes made through Documents of this driver
+        are recorded instead of being sent, and are flushed as bulk_write calls on exit or on Session.flush().
+
+        with driver.session(ordered=False) as session:
+            document.foo = 2
+            document.bar = 3
+
+        Parameters:
+        ordered (bool, optional): Whether the bulk_write calls are ordered.
+        chunk_size (int, optional): The maximum number of operations sent per bulk_write call.
+
+        Returns:
+        Session: The Session object, to be used as a context manager.
+        """
+        return Session(self, ordered, chunk_size)
+
+    def watch(
+            self,
+            callback: Callable[[dict], Any] | None = None,
+            pipeline: List[dict] | None = None,
+            full_document: str | None = None,
+            source: Iterable[dict] | Callable[[Any], Any] | None = None,
+    ) -> ChangeWatcher:
+        """
+        Follow the change stream of the collection in a background thread and keep Documents up to date with it.
+        Updates and replacements made by anyone are applied in place to the Documents this driver has handed out
+        since watch() was first called, and to those in the identity map. Every change empties the query cache,
+        and deleted documents leave the identity map. Then the callbacks are called with the change event.
+
+        with driver.watch(lambda event: print(event["operationType"])) as watcher:
+            ...
+
+        Change streams need a replica set or a sharded cluster. For tests, an iterable of change events can be given
+        as source instead; the watcher ends once it is exhausted.
+
+        Parameters:
+        callback (Callable[[dict], Any], optional): Called with every change event. More can be added with on_change().
+        pipeline (List[dict], optional): An aggregation pipeline applied to the change stream.
+        full_document (str, optional): The fullDocument option of the change stream, e.g. "updateLookup".
+        source (Iterable[dict] | Callable[[Any], Any], optional): The change events, or a function that is given
+            the resume token and opens the stream.
+
+        Returns:
+        ChangeWatcher: The running watcher. Call stop() on it, or use it as a context manager.
+        """
+        if self._live is None:
+            self._live = LiveDocuments()
+            if self.document_cache is not None:
+                for document in self.document_cache.values():
+                    if isinstance(document, BaseDocument):
+                        self._live.add(document)
+        if source is None:
+            def source(resume_token: Any) -> Any:
+                return self.client.watch(
+                    pipeline, full_document=full_document, resume_after=resume_token, max_await_time_ms=500
+                )
+        elif not callable(source):
+            events = source
+            source = lambda resume_token: events
+        return ChangeWatcher(source, self._apply_change, [callback] if callback is not None else []).start()
+
+    def _apply_change(self, event: dict):
+        """
+        Apply a change event to the live Documents with its _id and keep the caches coherent with it.
+        """
+        self._invalidate_queries()
+        doc_id = event.get("documentKey", {}).get("_id")
+        if doc_id is None:
+            return
+        if event.get("operationType") == "delete":
+            if self.document_cache is not None:
+                self.document_cache.pop(doc_id)
+            return
+        for document in self._live.get(doc_id):
+            changed = apply_change(document.variables, event)
+            if document._snapshot is not None:
+                # the change is already stored, so save() must not send it back
+                apply_change(document._snapshot, event)
+            for key in changed:
+                if key in document.variables:
+                    document._refresh_variable(key)
+                else:
+                    document._discard_variable(key)
+
+    def _write(self, document: Document, update: dict, fetch: bool = False) -> dict | None:
+        """
+        Send an update for a single Document, or record it on the active session.
+        With fetch, the new values of the updated keys are returned when the update is sent.
+        """
+        session = self.active_session
+        result = None
+        if session is not None:
+            session.record(document, update)
+        elif fetch:
+            result = fetch_update(self.client, document._id, update)
+        else:
+            self.client.update_one({"_id": ObjectId(document._id)}, update)
+        self._written(document._id, document)
+        return result
+
+    def _delete(self, document: Document):
+        """
+        Delete a single Document, or record the delete on the active session.
+        """
+        session = self.active_session
+        if session is not None:
+            session.record_delete(document)
+        else:
+            self.client.delete_one({"_id": ObjectId(document._id)})
+        self._written(document._id)
+
+    def _written(self, doc_id: str | ObjectId, document: Document | None = None):
+        """
+        Keep the identity map in step with a write to a document, and empty the query cache.
+        A cached Document is only kept if it is the instance that was written to, since that one holds the new values.
+        """
+        self._invalidate_queries()
+        if self.document_cache is None:
+            return
+        doc_id = ObjectId(doc_id)
+        if document is None or self.document_cache.peek(doc_id) is not document:
+            self.document_cache.pop(doc_id)
+
+    def _invalidate_queries(self):
+        """
+        Empty the query cache after a write.
+        """
+        if self.query_cache is not None:
+            self._query_generation += 1
+            self.query_cache.clear()
+
+    def _cached_read(self, key: Any, read: Callable[[], Any]) -> Any:
+        """
+        Serve a read from the query cache, or run it and cache its result unless a write happened meanwhile.
+        """
+        cached = self.query_cache.get(key, _NOT_CACHED)
+        if cached is not _NOT_CACHED:
+            return cached
+        generation = self._query_generation
+        result = read()
+        if generation == self._query_generation:
+            self.query_cache.put(key, result)
+        return result
+
+    @instrumented("create")
     def create(self, data: dict) -> Document:
         """
         Create a new document in the MongoDB collection from a dictionary and return it as a Document object.
@@ -184,127 +895,673 @@ class Driver:
         Document: A Document object representing the newly created document.
         """
         document = self.client.insert_one(data)
-        python_document = Document(document.inserted_id, data, self.client)
+        self._invalidate_queries()
+        python_document = self._make_document(data, document.inserted_id)
         return python_document
 
+    @instrumented("create_many")
+    def create_many(
+            self,
+            data: Iterable[dict],
+            chunk_size: int = 1000,
+            ordered: bool = False,
+            return_documents: bool = True,
+    ) -> CreateManyResult:
+        """
+        Create many documents in the MongoDB collection, streaming the input through insert_many in chunks.
+
+        Parameters:
+        data (Iterable[dict]): The dictionaries to insert. It is read one chunk at a time, so it can be a generator.
+        chunk_size (int, optional): The number of documents sent per insert_many call.
+        ordered (bool, optional): Whether the inserts are ordered. An ordered insert stops at the first failing chunk.
+        return_documents (bool, optional): Whether to build Document objects for the inserted documents.
+
+        Returns:
+        CreateManyResult: The inserted ids, the Document objects if requested, and the error of every failed chunk.
+        """
+        result = CreateManyResult(documents=[] if return_documents else None)
+        for index, chunk in enumerate(chunked(data, chunk_size)):
+            try:
+                self.client.insert_many(chunk, ordered=ordered)
+                inserted = chunk
+            except BulkWriteError as error:
+                result.errors[index] = error
+                inserted = inserted_from_error(chunk, error, ordered)
+            self._invalidate_queries()
+            result.inserted_ids.extend(document["_id"] for document in inserted)
+            if return_documents:
+                result.documents.extend(
+                    self._make_document(document, document["_id"]) for document in inserted
+                )
+            if ordered and index in result.errors:
+                break
+        return result
+
+    @instrumented("update")
     def update(
             self, data: dict | Document, new_values: dict, sort: dict = None
-    ) -> Document:
+    ) -> Document | None:
         """
         Update an existing document in the MongoDB collection with new values.
 
         Parameters:
         data (dict | Document): The document to be updated, either as a dictionary or a Document object.
+            A dictionary is used as a filter and only the first matching document is updated.
         new_values (dict): A dictionary of new values to update the document with.
         sort (dict, optional): A dictionary specifying the sort order for the update operation.
 
         Returns:
-        Document: A Document object representing the updated document.
+        Document | None: A Document object representing the updated document, or None if no document matched.
         """
         if "_id" in new_values.keys():
             new_values.pop("_id")
-        if sort is not None:
-            sort = sort.items()
-        if isinstance(data, Document):
-
-            self.client.find_one_and_update(
-                filter={"_id": ObjectId(data._id)},
-                update={"$set": new_values},
-                sort=sort,
-                return_document=True,
-            )
-            for _, (key, value) in enumerate(new_values.items()):
-                class_value = Variable(data._id, key, value, self.client, data)
-
-                data.variables[key] = new_values[key]
-                # setattr(self, variable, class_value)
-                data.__dict__[key] = class_value
+        if isinstance(data, BaseDocument) or (self._model is not None and self._model.owns(data)):
+            self._write(data, {"$set": new_values})
+            self._set_locally(data, new_values)
             return data
-        else:
-            if "_id" in data.keys() and not isinstance(data["_id"], ObjectId):
-                data["_id"] = ObjectId(data["_id"])
-            document = self.client.find_one_and_update(
-                filter=data,
-                update={"$set": new_values},
-                sort=sort,
-                return_document=True,
-            )
-            return Document(document.inserted_id, data, self.client)
+        self._object_id_filter(data)
+        self._check_plan(data)
+        document = self.client.find_one_and_update(
+            filter=data,
+            update={"$set": new_values},
+            sort=list(sort.items()) if sort is not None else None,
+            return_document=ReturnDocument.AFTER,
+        )
+        if document is None:
+            return None
+        self._written(document["_id"])
+        return self._make_document(document)
+
+    def _set_locally(self, document: Any, new_values: dict):
+        """
+        Give a Document or model instance the values of a $set that has been sent for it.
+        """
+        if not isinstance(document, BaseDocument):
+            for key, value in new_values.items():
+                setattr(document, key, value)
+            if self._model.track_changes:
+                document._snapshot.update(copy.deepcopy(new_values))
+            return
+        for key, value in new_values.items():
+            document.variables[key] = value
+            document._refresh_variable(key)
+            if document._snapshot is not None:
+                # already sent, so save() does not need to send it again
+                document._snapshot[key] = copy.deepcopy(value)
+
+    def _many_filter(self, data: dict | Iterable[Document]) -> tuple[dict, List[Any] | None]:
+        """
+        The filter of update_many or remove_many, and the Documents it was built from if any.
+        """
+        if isinstance(data, dict):
+            self._check_plan(self._object_id_filter(data))
+            return data, None
+        documents = list(data)
+        return {"_id": {"$in": [ObjectId(document._id) for document in documents]}}, documents
+
+    @instrumented("update_many")
+    def update_many(self, data: dict | Iterable[Document], new_values: dict) -> UpdateResult:
+        """
+        Update every matching document with one update_many call, instead of one round trip per document.
+
+        driver.update_many({"status": "trial"}, {"status": "expired"})
+        driver.update_many(documents, {"archived": True})
+
+        The update is sent right away, also while a session is active.
+
+        Parameters:
+        data (dict | Iterable[Document]): A dictionary of search terms, or Documents (or model instances) to update,
+            which are turned into one {"_id": {"$in": [...]}} filter and are given the new values.
+        new_values (dict): A dictionary of new values to set.
+
+        Returns:
+        UpdateResult: The result of update_many, with matched_count and modified_count.
+        """
+        if "_id" in new_values.keys():
+            new_values.pop("_id")
+        search_terms, documents = self._many_filter(data)
+        result = self.client.update_many(search_terms, {"$set": new_values})
+        if documents is None:
+            self._written_unknown()
+        for document in documents or ():
+            self._set_locally(document, new_values)
+            self._written(document._id, document)
+        return result
+
+    @instrumented("remove_many")
+    def remove_many(self, data: dict | Iterable[Document]) -> DeleteResult:
+        """
+        Remove every matching document with one delete_many call, instead of one round trip per document.
+
+        The removal is sent right away, also while a session is active.
 
-    def remove(self, data: dict | Document):
+        Parameters:
+        data (dict | Iterable[Document]): A dictionary of search terms, or Documents (or model instances) to remove,
+            which are turned into one {"_id": {"$in": [...]}} filter.
+
+        Returns:
+        DeleteResult: The result of delete_many, with deleted_count.
+        """
+        search_terms, documents = self._many_filter(data)
+        result = self.client.delete_many(search_terms)
+        if documents is None:
+            self._written_unknown()
+        for document in documents or ():
+            self._written(document._id)
+        return result
+
+    def _written_unknown(self):
+        """
+        Keep the caches in step with a write to documents that are not known, by emptying them.
+        """
+        self._invalidate_queries()
+        if self.document_cache is not None:
+            self.document_cache.clear()
+
+    @instrumented("save")
+    def save(self, instance: Any) -> bool:
+        """
+        Send the changes made to a model instance since it was loaded or last saved as one update.
+        Only available for a Driver created with model and track_changes=True.
+
+        Parameters:
+        instance (Any): An instance of the model returned by this driver.
+
+        Returns:
+        bool: Whether an update was sent.
+        """
+        if self._model is None or not self._model.owns(instance):
+            raise TypeError("save() needs an instance of the model of this driver, use Document.save() for Documents")
+        update = self._model.changes(instance)
+        if update:
+            self._write(instance, update)
+        self._model.saved(instance)
+        return bool(update)
+
+    @instrumented("remove")
+    def remove(self, data: dict | Document, return_document: bool = False) -> Document | None:
         """
         Remove a document from the MongoDB collection.
 
         Parameters:
         data (dict | Document): The document to be removed, either as a dictionary or a Document object.
+        return_document (bool, optional): Whether to fetch the removed document when data is a dictionary.
+            Without it the removal is a plain delete_one and nothing is sent back by the server.
+
+        Returns:
+        Document | None: The removed document if return_document was set and a document matched, otherwise None.
         """
-        if isinstance(data, Document):
-            self.client.find_one_and_delete({"_id": ObjectId(data._id)})
+        if isinstance(data, BaseDocument) or (self._model is not None and self._model.owns(data)):
+            self._delete(data)
+            return None
+        self._object_id_filter(data)
+        self._check_plan(data)
+        if return_document:
+            document = self.client.find_one_and_delete(data)
+        elif self.document_cache is not None and not isinstance(data.get("_id"), ObjectId):
+            # the identity map needs to know which document went away
+            document = self.client.find_one_and_delete(data, projection={"_id": 1})
         else:
-            if "_id" in data.keys() and not isinstance(data["_id"], ObjectId):
-                data["_id"] = ObjectId(data["_id"])
-            self.client.find_one_and_delete(data)
+            self.client.delete_one(data)
+            if "_id" in data.keys():
+                self._written(data["_id"])
+            else:
+                self._invalidate_queries()
+            return None
+        if document is None:
+            return None
+        self._written(document["_id"])
+        return self._make_document(document) if return_document else None
 
-    def load(self) -> List[Document]:
+    @instrumented("load")
+    def load(self, projection: dict | List[str] | None = None) -> List[Document]:
         """
         Load all documents from the MongoDB collection into Document objects.
 
+        Parameters:
+        projection (dict | List[str], optional): The fields to return. See find().
+
         Returns:
         List[Document]: A list of Document objects representing all documents in the collection.
         """
-        documents = self.client.find({})
-        loaded_documents = []
-        for document in documents:
-            doc_id = document["_id"]
-            document.pop("_id")
-            python_document = Document(str(doc_id), document, self.client)
-            loaded_documents.append(python_document)
-        return loaded_documents
+        return self.find({}, projection=projection)
 
-    def find(self, search_terms: dict) -> List[Document]:
+    def iter_load(self, batch_size: int = 0, projection: dict | List[str] | None = None) -> Iterator[Document]:
+        """
+        Stream all documents from the MongoDB collection as Document objects, one cursor batch at a time.
+
+        Parameters:
+        batch_size (int, optional): The number of documents fetched per round trip. 0 lets the server decide.
+        projection (dict | List[str], optional): The fields to return. See find().
+
+        Returns:
+        Iterator[Document]: A generator of Document objects representing all documents in the collection.
+        """
+        return self.iter_find({}, batch_size=batch_size, projection=projection)
+
+    @instrumented("find")
+    def find(self, search_terms: dict, projection: dict | List[str] | None = None) -> List[Document]:
         """
         Find documents in the MongoDB collection that match the search terms and return them as Document objects.
 
         Parameters:
         search_terms (dict): A dictionary of search terms to filter the documents.
+        projection (dict | List[str], optional): The fields to return, e.g. {"foo": 1}, {"blob": 0} or ["foo"].
+            Reading a field the projection left out fetches it for all the returned documents with one query.
+            _id cannot be excluded.
 
         Returns:
         List[Document]: A list of Document objects representing the matching documents.
+            With the query cache, the same Document objects are returned to every caller of the same query.
+        """
+        if self.query_cache is None:
+            return list(self.iter_find(search_terms, projection=projection))
+        self._object_id_filter(search_terms)
+        key = query_key("find", search_terms, self._projection(projection))
+        return list(self._cached_read(key, lambda: list(self.iter_find(search_terms, projection=projection))))
+
+    def iter_find(
+            self,
+            search_terms: dict,
+            batch_size: int = 0,
+            projection: dict | List[str] | None = None,
+            sort: dict | None = None,
+            limit: int = 0,
+    ) -> Iterator[Document]:
+        """
+        Find documents in the MongoDB collection that match the search terms and stream them as Document objects.
+        Documents are built as the cursor is read, so memory use does not grow with the number of results.
+        The cursor is closed when the generator is exhausted, closed or garbage collected.
+
+        Parameters:
+        search_terms (dict): A dictionary of search terms to filter the documents.
+        batch_size (int, optional): The number of documents fetched per round trip. 0 lets the server decide.
+        projection (dict | List[str], optional): The fields to return. See find().
+        sort (dict, optional): A dictionary specifying the sort order, e.g. {"foo": pymongo.ASCENDING}.
+        limit (int, optional): The maximum number of documents to return. 0 means no limit.
+
+        Returns:
+        Iterator[Document]: A generator of Document objects representing the matching documents.
+        """
+        projection = self._projection(projection)
+        self._object_id_filter(search_terms)
+        sort = list(sort.items()) if sort is not None else None
+        self._check_plan(search_terms, sort)
+        cursor = self._read_client.find(
+            search_terms,
+            projection=projection,
+            sort=sort,
+            limit=limit,
+            batch_size=batch_size,
+        )
+        documents = self._iter_cursor(cursor, projection, batch_size)
+        if self.instrumentation is not None:
+            return self.instrumentation.stream("iter_find", documents)
+        return documents
+
+    def aggregate(
+            self,
+            pipeline: List[dict] | None = None,
+            allow_disk_use: bool = False,
+            batch_size: int = 0,
+            documents: bool = True,
+    ) -> Aggregation:
+        """
+        Start an aggregation pipeline, built with the stage methods of the returned Aggregation and run on the server
+        when it is iterated, so grouping and joining happen there instead of on every document pulled over the wire.
+
+        top_customers = (
+            driver.aggregate(allow_disk_use=True)
+            .match({"status": "paid"})
+            .group("$customer_id", total={"$sum": "$amount"})
+            .sort({"total": -1})
+            .limit(10)
+            .lookup("customers", "_id", "_id", "customer")
+        )
+        for row in top_customers:
+            print(row["customer"][0]["name"], row["total"])
+
+        Results are streamed one cursor batch at a time. They are Documents as long as they are documents of this
+        collection, and plain dicts once a stage reshapes them ($group, $unwind, $replaceRoot, ...) or when they
+        have no _id. A leading $match is checked by detect_collscans, and a pipeline that ends with $out or $merge
+        empties the caches once it has run.
+
+        Parameters:
+        pipeline (List[dict], optional): Stages to start with.
+        allow_disk_use (bool, optional): Whether stages may write temporary files when they exceed the memory limit.
+        batch_size (int, optional): The number of results fetched per round trip. 0 lets the server decide.
+        documents (bool, optional): Whether to return Documents when possible. Plain dicts are always returned without it.
+
+        Returns:
+        Aggregation: The pipeline, to add stages to and iterate.
+        """
+        return Aggregation(self, pipeline, allow_disk_use, batch_size, documents)
+
+    def _iter_aggregate(self, aggregation: Aggregation) -> Iterator[Document | dict]:
+        """
+        Run an aggregation and stream its results.
+        """
+        if aggregation.stages and "$match" in aggregation.stages[0]:
+            self._check_plan(self._object_id_filter(aggregation.stages[0]["$match"]))
+        rows = self._iter_aggregate_cursor(aggregation)
+        if self.instrumentation is not None:
+            return self.instrumentation.stream("aggregate", rows)
+        return rows
+
+    def _iter_aggregate_cursor(self, aggregation: Aggregation) -> Iterator[Document | dict]:
+        # pymongo sends the aggregate command as soon as aggregate() is called, so it is called on the first next()
+        cursor = self.client.aggregate(aggregation.stages, **aggregation.options())
+        if aggregation.writes():
+            self._written_unknown()
+        documents = aggregation.documents and aggregation.keeps_ids()
+        try:
+            for row in cursor:
+                yield self._make_document(row) if documents and "_id" in row else row
+        finally:
+            cursor.close()
+
+    @instrumented("paginate")
+    def paginate(
+            self,
+            search_terms: dict,
+            page_size: int,
+            sort_key: str = "_id",
+            after: str | None = None,
+            descending: bool = False,
+    ) -> Page:
+        """
+        Get one page of the documents that match the search terms, sorted by sort_key and then _id.
+        Each page continues where the previous one stopped with a range filter instead of skipping documents,
+        so every page costs the same however deep it is, as long as sort_key is indexed, e.g. with an index on
+        (sort_key, _id). Documents with a null or missing sort_key come first, or last when descending.
+
+        page = driver.paginate({"status": "active"}, 100, sort_key="created")
+        while page.has_next:
+            page = driver.paginate({"status": "active"}, 100, sort_key="created", after=page.next_token)
+
+        Parameters:
+        search_terms (dict): A dictionary of search terms to filter the documents.
+        page_size (int): The maximum number of documents per page.
+        sort_key (str, optional): The key the pages are sorted by.
+        after (str, optional): The next_token of the previous page. The first page is returned when not given.
+        descending (bool, optional): Whether the pages go from the highest sort_key value to the lowest.
+
+        Returns:
+        Page: The documents of the page and the token of the next page.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        self._object_id_filter(search_terms)
+        query, sort = keyset_query(search_terms, sort_key, after, descending)
+        self._check_plan(query, sort)
+        cursor = self._read_client.find(query, sort=sort, limit=page_size + 1)
+        try:
+            rows = list(cursor)
+        finally:
+            cursor.close()
+        page = Page()
+        if len(rows) > page_size:
+            # one more document than needed tells whether there is a next page
+            page.next_token = encode_token(rows[page_size - 1], sort_key)
+        page.documents = [self._make_document(row) for row in rows[:page_size]]
+        return page
+
+    def parallel_scan(
+            self,
+            search_terms: dict,
+            fn: Callable[[List[Document]], Any],
+            partitions: int = 8,
+            workers: int | None = None,
+            batch_size: int = 1000,
+            reduce: Callable[[Any, Any], Any] | None = None,
+    ) -> Iterator[Any] | Any:
+        """
+        Scan the documents that match the search terms in parallel worker processes.
+        The _id key space is split into partitions ranges of about the same size with $bucketAuto, and each range
+        is scanned by a worker process with its own client, which calls fn on each batch of Documents it reads.
+
+        def count_active(documents):
+            return sum(1 for document in documents if document.active)
+
+        total = driver.parallel_scan({}, count_active, partitions=16, workers=4, reduce=operator.add)
+
+        fn and reduce are sent to the worker processes, so they must be picklable, e.g. functions defined at module level.
+        Workers connect with connection_url and the settings of this driver, even if it was given a mongo_client,
+        and do not use its identity map.
+
+        Parameters:
+        search_terms (dict): A dictionary of search terms to filter the documents.
+        fn (Callable[[List[Document]], Any]): Called in a worker with each batch of Documents.
+        partitions (int, optional): The number of _id ranges to split the scan into.
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        batch_size (int, optional): The number of Documents per call to fn, and per cursor round trip.
+        reduce (Callable[[Any, Any], Any], optional): Combines two results of fn. When given, each worker reduces
+            the results of its partition and only the reduction is sent back.
+
+        Returns:
+        Iterator[Any] | Any: The results of fn in the order partitions finish, or their reduction if reduce is given,
+            None if nothing matched.
+        """
+        results = self._iter_parallel_scan(search_terms, fn, partitions, workers, batch_size, reduce)
+        if reduce is None:
+            return results
+        results = list(results)
+        return functools.reduce(reduce, results) if results else None
+
+    def _iter_parallel_scan(
+            self,
+            search_terms: dict,
+            fn: Callable[[List[Document]], Any],
+            partitions: int,
+            workers: int | None,
+            batch_size: int,
+            reduce: Callable[[Any, Any], Any] | None,
+    ) -> Iterator[Any]:
+        local_settings = (
+            "mongo_client", "cache_size", "cache_ttl", "query_cache_size", "query_cache_ttl", "detect_collscans",
+            "instrumentation",
+        )
+        settings = {
+            setting.name: getattr(self, setting.name) for setting in fields(self) if setting.name not in local_settings
+        }
+        filters = partition_filters(self.client, self._object_id_filter(search_terms), partitions)
+        if not filters:
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(scan_partition, settings, partition, fn, batch_size, reduce)
+                for partition in filters
+            ]
+            try:
+                for future in as_completed(futures):
+                    yield from future.result()
+            finally:
+                # stops the partitions that have not started if iteration is abandoned
+                for future in futures:
+                    future.cancel()
+
+    @instrumented("export")
+    def export(
+            self,
+            path: str,
+            search_terms: dict | None = None,
+            format: str = "jsonl",
+            compress: bool = False,
+            batch_size: int = 1000,
+            resume: bool = False,
+    ) -> int:
+        """
+        Stream the documents that match the search terms to a file, one cursor batch at a time, so memory use does not
+        grow with the size of the collection. Documents are written in _id order and no Document objects are built.
+
+        driver.export("users.jsonl.gz", {"active": True}, compress=True)
+        driver.export("users.bson", format="bson", resume=True)  # continues an export that stopped part way
+
+        Parameters:
+        path (str): The file to write.
+        search_terms (dict, optional): A dictionary of search terms to filter the documents. All documents by default.
+        format (str, optional): "jsonl" for one canonical extended JSON document per line,
+            or "bson" for mongodump-style BSON.
+        compress (bool, optional): Whether to gzip the file.
+        batch_size (int, optional): The number of documents fetched per round trip and written at once.
+        resume (bool, optional): Whether to continue from the checkpoint an interrupted export left next to the file.
+
+        Returns:
+        int: The number of documents in the file.
+        """
+        if search_terms:
+            self._object_id_filter(search_terms)
+        return export_collection(self.client, path, search_terms, format, compress, batch_size, resume)
+
+    @instrumented("import")
+    def import_(
+            self,
+            path: str,
+            chunk_size: int = 1000,
+            workers: int = 4,
+            upsert: bool = False,
+            resume: bool = False,
+            format: str | None = None,
+    ) -> int:
+        """
+        Stream a file written by export() into the collection, with workers insert_many calls of chunk_size documents
+        running at the same time. Only a few chunks are read ahead, so memory use does not grow with the size of the file.
+
+        driver.import_("users.jsonl.gz", workers=8)
+        driver.import_("users.bson", upsert=True, resume=True)  # continues an import that stopped part way
+
+        Parameters:
+        path (str): The file to read. Compressed files are recognized by their content.
+        chunk_size (int, optional): The number of documents per write.
+        workers (int, optional): The number of chunks written at the same time.
+        upsert (bool, optional): Whether to replace the documents with the same _id with bulk_write upserts,
+            instead of inserting them.
+        resume (bool, optional): Whether to continue from the checkpoint an interrupted import left next to the file.
+        format (str, optional): "jsonl" or "bson". Defaults to "bson" for .bson and .bson.gz files, "jsonl" otherwise.
+
+        Returns:
+        int: The number of documents written by this call.
+        """
+        try:
+            return import_collection(self.client, path, chunk_size, workers, upsert, resume, format)
+        finally:
+            self._written_unknown()
+
+    def _iter_cursor(
+            self, cursor: pymongo.cursor.Cursor, projection: dict | None = None, batch_size: int = 0
+    ) -> Iterator[Document]:
+        """
+        Build a Document for each document of a cursor, closing the cursor when iteration stops.
+        Documents of a projected read are put in FetchGroups of at most one batch, or 1000 documents.
+        """
+        group = None
+        try:
+            for document in cursor:
+                python_document = self._make_document(document)
+                if projection is not None and self._model is None:
+                    if group is None or len(group) >= (batch_size or 1000):
+                        group = FetchGroup(self.client, projection)
+                    group.add(python_document)
+                yield python_document
+        finally:
+            cursor.close()
+
+    def _projection(self, projection: dict | List[str] | None) -> dict | None:
+        """
+        Normalize the projection of a read, see normalize_projection().
+        """
+        if projection is not None and self._model is not None and self._model.track_changes:
+            # a model fills the fields left out with its defaults, which save() would then write back
+            raise ValueError("projections cannot be used with a model and track_changes")
+        return normalize_projection(projection)
+
+    def _make_document(self, document: dict | RawBSONDocument, doc_id: str | ObjectId | None = None) -> Document:
+        """
+        Build a Document from a document returned by the database, timing it if the driver is instrumented.
+        """
+        if self.instrumentation is not None:
+            return self.instrumentation.build(self._build_document, document, doc_id)
+        return self._build_document(document, doc_id)
+
+    def _build_document(self, document: dict | RawBSONDocument, doc_id: str | ObjectId | None = None) -> Document:
+        """
+        Build a Document from a document returned by the database, taking a snapshot of it if changes are tracked.
+        """
+        if self._model is not None:
+            return self._model.build(document)
+        if isinstance(document, RawBSONDocument):
+            doc_id = str(raw_id(document)) if doc_id is None else doc_id
+            document = RawVariables(document.raw)
+        if doc_id is None:
+            doc_id = str(document["_id"])
+        python_document = self._document_class(doc_id, document, self.client, _driver=self)
+        if self.track_changes:
+            python_document._snapshot = copy.deepcopy(python_document.variables)
+        if self._live is not None:
+            self._live.add(python_document)
+        return python_document
+
+    @staticmethod
+    def _object_id_filter(search_terms: dict) -> dict:
+        """
+        Convert a string _id in the search terms into an ObjectId, in place.
+        Operator expressions such as {"$in": [...]} are left as they are.
         """
-        """FIND A DOCUMENT AND RETURN IT AS A Document CLASS"""
         if "_id" in search_terms.keys() and not isinstance(
-                search_terms["_id"], ObjectId
+                search_terms["_id"], (ObjectId, dict)
         ):
             search_terms["_id"] = ObjectId(search_terms["_id"])
-        processed_documents = []
-        documents = self.client.find(search_terms)
-        for document in documents:
-            doc_id = str(document["_id"])
-            python_document = Document(doc_id, document, self.client)
-            processed_documents.append(python_document)
-        return processed_documents
+        return search_terms
 
-    def find_one(self, search_terms: dict) -> Document | None:
+    @instrumented("find_one")
+    def find_one(self, search_terms: dict, projection: dict | List[str] | None = None) -> Document | None:
         """
        Find a single document in the MongoDB collection that matches the search terms and return it as a Document object.
 
        Parameters:
        search_terms (dict): A dictionary of search terms to filter the documents.
+       projection (dict | List[str], optional): The fields to return. Fields left out are fetched when first read.
+           Projected lookups do not use the identity map.
 
        Returns:
        Document | None: A Document object representing the matching document, or None if no document is found.
        """
-        if "_id" in search_terms.keys() and not isinstance(
-                search_terms["_id"], ObjectId
-        ):
-            search_terms["_id"] = ObjectId(search_terms["_id"])
-        document = self.client.find_one(search_terms)
+        projection = self._projection(projection)
+        self._object_id_filter(search_terms)
+        cache_key = self._cache_key(search_terms) if projection is None else None
+        if cache_key is not None:
+            cached = self.document_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        if cache_key is None and self.query_cache is not None:
+            return self._cached_read(
+                query_key("find_one", search_terms, projection), lambda: self._find_one(search_terms, projection)
+            )
+        python_document = self._find_one(search_terms, projection)
+        if cache_key is not None and python_document is not None:
+            self.document_cache.put(cache_key, python_document)
+        return python_document
+
+    def _find_one(self, search_terms: dict, projection: dict | None) -> Document | None:
+        self._check_plan(search_terms)
+        document = self._read_client.find_one(search_terms, projection)
         if document is None:
             return None
-        doc_id = str(document["_id"])
-        python_document = Document(doc_id, document, self.client)
+        python_document = self._make_document(document)
+        if projection is not None and self._model is None:
+            FetchGroup(self.client, projection).add(python_document)
         return python_document
 
+    def _cache_key(self, search_terms: dict) -> ObjectId | None:
+        """
+        The identity map key for a find_one lookup, or None if the lookup cannot be served from the identity map.
+        Only lookups by nothing but an ObjectId _id are cached.
+        """
+        if self.document_cache is None or len(search_terms) != 1:
+            return None
+        doc_id = search_terms.get("_id")
+        return doc_id if isinstance(doc_id, ObjectId) else None
+
 
 class ObjectPacker:
     # packing and unpacking objects is simple and technically this implementation may not be needed.
@@ -0,0 +1,106 @@
+import base64
+from typing import Any, Iterator, List, Tuple
+from dataclasses import dataclass, field
+import bson
+import pymongo
+from bson.errors import BSONError
+
+_MISSING = object()
+
+
+@dataclass
+class Page:
+    """
+    One page of Driver.paginate.
+
+    documents holds the documents of the page, in sort order.
+    next_token is passed as after to get the next page, and is None on the last page.
+    """
+    documents: List[Any] = field(default_factory=list)
+    next_token: str | None = None
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.documents)
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_token is not None
+
+
+def _value_at(document: Any, path: str) -> Any:
+    value = document
+    for key in path.split("."):
+        try:
+            value = value[key]
+        except (KeyError, TypeError, IndexError):
+            return None
+    return value
+
+
+def encode_token(document: Any, sort_key: str) -> str:
+    """
+    Build the continuation token that points just past a document.
+    The token holds the sort key value and _id of the document, as BSON so their types survive the round trip.
+    """
+    position = {"key": sort_key, "value": _value_at(document, sort_key), "_id": document["_id"]}
+    return base64.urlsafe_b64encode(bson.encode(position)).decode("ascii")
+
+
+def decode_token(token: str, sort_key: str) -> Tuple[Any, Any]:
+    """
+    Read the sort key value and _id from a continuation token.
+    """
+    try:
+        position = bson.decode(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (ValueError, BSONError):
+        raise ValueError("invalid pagination token")
+    if position.get("key") != sort_key:
+        raise ValueError(f"the pagination token was made for sort_key {position.get('key')!r}, not {sort_key!r}")
+    return position["value"], position["_id"]
+
+
+def keyset_query(
+        search_terms: dict, sort_key: str, after: str | None, descending: bool = False
+) -> Tuple[dict, List[Tuple[str, int]]]:
+    """
+    Build the filter and sort of one page.
+    Pages are ranges of (sort_key, _id), so each page is an index range scan that costs the same however deep it is,
+    and _id breaks ties between documents with the same sort key value.
+    Documents with a null or missing sort_key sort before all others, or after them in descending order.
+    The sort_key values should otherwise be of one type, since range operators only match values of the same type.
+
+    Parameters:
+    search_terms (dict): The filter of the pagination.
+    sort_key (str): The key the pages are sorted by.
+    after (str | None): The continuation token of the previous page, None for the first page.
+    descending (bool, optional): Whether the pages go from the highest value to the lowest.
+
+    Returns:
+    Tuple[dict, List[Tuple[str, int]]]: The filter and the sort of the page.
+    """
+    direction = pymongo.DESCENDING if descending else pymongo.ASCENDING
+    sort = [(sort_key, direction)] if sort_key == "_id" else [(sort_key, direction), ("_id", direction)]
+    if after is None:
+        return search_terms, sort
+    value, doc_id = decode_token(after, sort_key)
+    beyond = "$lt" if descending else "$gt"
+    if sort_key == "_id":
+        range_filter = {"_id": {beyond: doc_id}}
+    else:
+        ties = {sort_key: value, "_id": {beyond: doc_id}}
+        if value is None:
+            # null and missing values sort before every other value, and {"$gt": None} matches nothing,
+            # so every non-null value comes after them in ascending order and none in descending order
+            range_filter = ties if descending else {"$or": [ties, {sort_key: {"$ne": None}}]}
+        else:
+            branches = [{sort_key: {beyond: value}}, ties]
+            if descending:
+                # {"$lt": value} does not match null or missing values, which sort last in descending order
+                branches.append({sort_key: None})
+            range_filter = {"$or": branches}
+    if not search_terms:
+        return range_filter, sort
+    return {"$and": [search_terms, range_filter]}, sort
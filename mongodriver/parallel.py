@@ -0,0 +1,66 @@
+import functools
+from typing import Any, Callable, Dict, List
+from .utils import chunked
+
+
+def partition_filters(collection: Any, search_terms: dict, partitions: int) -> List[dict]:
+    """
+    Split the documents that match the search terms into ranges of _id of about the same size with $bucketAuto.
+    The first range has no lower bound and the last no upper bound, so documents inserted during a scan
+    outside of the sampled _id range still belong to a partition.
+
+    Parameters:
+    collection (Any): The pymongo Collection.
+    search_terms (dict): A dictionary of search terms to filter the documents.
+    partitions (int): The number of ranges wanted. Fewer are returned if there are fewer documents.
+
+    Returns:
+    List[dict]: One filter per range, each combining the search terms with the _id range.
+    """
+    if partitions < 1:
+        raise ValueError("partitions must be at least 1")
+    buckets = list(collection.aggregate([
+        {"$match": search_terms},
+        {"$bucketAuto": {"groupBy": "$_id", "buckets": partitions}},
+    ], allowDiskUse=True))
+    lower_bounds = [bucket["_id"]["min"] for bucket in buckets]
+    filters = []
+    for index in range(len(lower_bounds)):
+        id_range = {}
+        if index > 0:
+            id_range["$gte"] = lower_bounds[index]
+        if index + 1 < len(lower_bounds):
+            id_range["$lt"] = lower_bounds[index + 1]
+        if not id_range:
+            filters.append(search_terms)
+        elif search_terms:
+            filters.append({"$and": [search_terms, {"_id": id_range}]})
+        else:
+            filters.append({"_id": id_range})
+    return filters
+
+
+def scan_partition(
+        settings: Dict[str, Any],
+        search_terms: dict,
+        fn: Callable[[List[Any]], Any],
+        batch_size: int,
+        reduce: Callable[[Any, Any], Any] | None,
+) -> List[Any]:
+    """
+    Scan one partition in a worker process.
+    The worker builds its own Driver, so it connects with its own client, and calls fn on each batch of documents.
+
+    Returns:
+    List[Any]: The result of fn for each batch, or a list holding their reduction if reduce is given.
+    """
+    from .mongodriver import Driver
+
+    driver = Driver(**settings)
+    try:
+        results = [fn(batch) for batch in chunked(driver.iter_find(search_terms, batch_size=batch_size), batch_size)]
+    finally:
+        driver.close()
+    if reduce is not None and results:
+        return [functools.reduce(reduce, results)]
+    return results
@@ -0,0 +1,131 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+import pymongo
+
+
+def _freeze(value: Any) -> Hashable:
+    """
+    Turn a client option into something hashable so it can be part of a registry key.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return id(value)
+    return value
+
+
+class ClientRegistry:
+    """
+    A process-wide registry of MongoDB clients, so every Driver connecting to the same cluster with the same options
+    shares one client and therefore one connection pool.
+
+    Clients are reference counted: release() closes a client once no Driver uses it anymore.
+    Clients are never shared with a forked child process. The child starts with an empty registry and connects again.
+    With scope, clients are only shared between calls of get() for which scope() returns the same value,
+    e.g. the running event loop for clients that are bound to the loop they are first used on.
+    """
+
+    def __init__(self, factory: Callable[..., Any], scope: Callable[[], Hashable] | None = None):
+        self.factory = factory
+        self.scope = scope
+        self._clients: Dict[Hashable, Tuple[Any, int]] = {}
+        self._keys: Dict[int, Hashable] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._forget)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def _forget(self):
+        """
+        Drop every client without closing it. Used in a forked child, where the parent's clients must not be used.
+        """
+        self._clients = {}
+        self._keys = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def get(self, connection_url: str, **options) -> Any:
+        """
+        Get the shared client for a connection URL and options, creating it if needed.
+
+        Parameters:
+        connection_url (str): The MongoDB connection URL.
+        **options: Keyword arguments for the client, e.g. maxPoolSize=50.
+
+        Returns:
+        Any: The shared client.
+        """
+        if os.getpid() != self._pid:
+            self._forget()
+        key = (connection_url, _freeze(options), self.scope() if self.scope is not None else None)
+        with self._lock:
+            client, references = self._clients.get(key, (None, 0))
+            if client is None:
+                client = self.factory(connection_url, **options)
+                self._keys[id(client)] = key
+            self._clients[key] = (client, references + 1)
+            return client
+
+    def release(self, client: Any):
+        """
+        Give back a client obtained from get(). The client is closed when it is no longer used by anyone.
+
+        Parameters:
+        client (Any): The client to give back. Clients the registry does not know about are ignored.
+        """
+        with self._lock:
+            key = self._keys.get(id(client))
+            if key is None:
+                return
+            client, references = self._clients[key]
+            if references > 1:
+                self._clients[key] = (client, references - 1)
+                return
+            del self._clients[key]
+            del self._keys[id(client)]
+        client.close()
+
+    def close(self):
+        """
+        Close every client in the registry, whether or not Drivers still use it.
+        """
+        with self._lock:
+            clients = [client for client, _ in self._clients.values()]
+            self._clients = {}
+            self._keys = {}
+        for client in clients:
+            client.close()
+
+
+def pool_options(
+        max_pool_size: int | None = None,
+        min_pool_size: int | None = None,
+        max_idle_time_ms: int | None = None,
+) -> Dict[str, int]:
+    """
+    Build the client keyword arguments for the pool settings that were given.
+    """
+    options = {
+        "maxPoolSize": max_pool_size,
+        "minPoolSize": min_pool_size,
+        "maxIdleTimeMS": max_idle_time_ms,
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+
+clients = ClientRegistry(pymongo.MongoClient)
+
+
+def close_clients():
+    """
+    Close every shared client of the synchronous Driver.
+    """
+    clients.close()
@@ -0,0 +1,186 @@
+import copy
+import struct
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Tuple
+import bson
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+_INT32 = struct.Struct("<i")
+
+# the size of the value of each BSON element type that has a fixed size
+_FIXED_SIZES = {
+    0x01: 8,  # double
+    0x06: 0,  # undefined
+    0x07: 12,  # ObjectId
+    0x08: 1,  # bool
+    0x09: 8,  # datetime
+    0x0A: 0,  # null
+    0x10: 4,  # int32
+    0x11: 8,  # timestamp
+    0x12: 8,  # int64
+    0x13: 16,  # decimal128
+    0x7F: 0,  # max key
+    0xFF: 0,  # min key
+}
+# element types whose value starts with its size as an int32
+_STRING_TYPES = {0x02, 0x0D, 0x0E}  # string, code, symbol
+_SIZED_TYPES = {0x03, 0x04, 0x0F}  # document, array, code with scope
+
+
+def _value_end(data: bytes, element_type: int, start: int) -> int:
+    """
+    Find where the value of a BSON element that starts at start ends, without decoding it.
+    """
+    size = _FIXED_SIZES.get(element_type)
+    if size is not None:
+        return start + size
+    if element_type in _STRING_TYPES:
+        return start + 4 + _INT32.unpack_from(data, start)[0]
+    if element_type in _SIZED_TYPES:
+        return start + _INT32.unpack_from(data, start)[0]
+    if element_type == 0x05:  # binary: size, subtype, bytes
+        return start + 5 + _INT32.unpack_from(data, start)[0]
+    if element_type == 0x0B:  # regex: two C strings
+        return data.index(b"\x00", data.index(b"\x00", start) + 1) + 1
+    if element_type == 0x0C:  # DBPointer: string and ObjectId
+        return start + 4 + _INT32.unpack_from(data, start)[0] + 12
+    raise bson.InvalidBSON(f"unknown element type {element_type:#x}")
+
+
+def iter_elements(data: bytes, position: int = 4) -> Iterator[Tuple[str, int, int]]:
+    """
+    Walk the top-level elements of a BSON document without decoding their values.
+
+    Parameters:
+    data (bytes): The BSON document.
+    position (int, optional): The offset of the element to start from. The first element by default.
+
+    Returns:
+    Iterator[Tuple[str, int, int]]: The key of each element with the offsets where the element starts and ends.
+    """
+    end = len(data) - 1
+    while position < end:
+        key_end = data.index(b"\x00", position + 1)
+        key = data[position + 1:key_end].decode("utf-8")
+        element_end = _value_end(data, data[position], key_end + 1)
+        yield key, position, element_end
+        position = element_end
+
+
+def decode_element(data: bytes, start: int, end: int) -> Any:
+    """
+    Decode one top-level element of a BSON document, including any subdocuments it holds.
+    """
+    element = data[start:end]
+    return next(iter(bson.decode(_INT32.pack(len(element) + 5) + element + b"\x00").values()))
+
+
+def raw_id(document: RawBSONDocument) -> Any:
+    """
+    Read the _id of a raw document, decoding nothing else when _id is its first element, as the server stores it.
+    """
+    data = document.raw
+    if data[4] == 0x07 and data[5:9] == b"_id\x00":
+        return ObjectId(data[9:21])
+    for key, start, end in iter_elements(data):
+        if key == "_id":
+            return decode_element(data, start, end)
+    raise KeyError("_id")
+
+
+class RawVariables(MutableMapping):
+    """
+    The variables of a Document read from a Driver created with raw_bson=True.
+    Keeps the BSON bytes returned by the server and decodes a field the first time it is read.
+    Fields that are changed or deleted are kept apart from the bytes, which are never modified.
+    """
+    __slots__ = ("raw", "_offsets", "_scanned", "_values", "_deleted")
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        # where each element scanned so far starts and ends, elements are only scanned up to the one needed
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._scanned = 4
+        self._values: Dict[str, Any] = {}
+        self._deleted = set()
+
+    def _scan(self, until: str | None = None) -> Tuple[int, int] | None:
+        """
+        Record the offsets of the elements that follow the last scanned one, up to the element named until.
+        """
+        for key, start, end in iter_elements(self.raw, self._scanned):
+            self._offsets[key] = (start, end)
+            self._scanned = end
+            if key == until:
+                return self._offsets[key]
+        return None
+
+    def _offsets_of(self, key: str) -> Tuple[int, int] | None:
+        offsets = self._offsets.get(key)
+        if offsets is None:
+            offsets = self._scan(key)
+        return offsets
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        offsets = None if key in self._deleted else self._offsets_of(key)
+        if offsets is None:
+            raise KeyError(key)
+        value = self._values[key] = decode_element(self.raw, *offsets)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self._values[key] = value
+        self._deleted.discard(key)
+
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self._values.pop(key, None)
+        self._deleted.add(key)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._values:
+            return True
+        return isinstance(key, str) and key not in self._deleted and self._offsets_of(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        self._scan()
+        for key in self._offsets:
+            if key not in self._deleted:
+                yield key
+        for key in list(self._values):
+            if key not in self._offsets:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(self.decode())
+
+    def __deepcopy__(self, memo: dict) -> "RawVariables":
+        # the bytes never change, so only the decoded and changed values are copied
+        duplicate = RawVariables(self.raw)
+        duplicate._offsets = self._offsets.copy()
+        duplicate._scanned = self._scanned
+        duplicate._values = copy.deepcopy(self._values, memo)
+        duplicate._deleted = self._deleted.copy()
+        return duplicate
+
+    def decode(self) -> dict:
+        """
+        Decode the whole document at once.
+
+        Returns:
+        dict: The variables as a plain dict, with the changes made so far.
+        """
+        variables = bson.decode(self.raw)
+        for key in self._deleted:
+            variables.pop(key, None)
+        variables.update(self._values)
+        return variables
@@ -0,0 +1,40 @@
+from typing import Any, Dict, List
+from dataclasses import dataclass, field
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+
+@dataclass
+class CreateManyResult:
+    """
+    The outcome of Driver.create_many.
+
+    inserted_ids holds the _id of every inserted document, in input order.
+    documents holds the matching Document objects, or None when return_documents was False.
+    errors maps the index of every chunk that failed to the BulkWriteError it raised.
+    """
+    inserted_ids: List[ObjectId] = field(default_factory=list)
+    documents: List[Any] | None = None
+    errors: Dict[int, BulkWriteError] = field(default_factory=dict)
+
+    @property
+    def inserted_count(self) -> int:
+        return len(self.inserted_ids)
+
+
+def inserted_from_error(chunk: List[dict], error: BulkWriteError, ordered: bool) -> List[dict]:
+    """
+    Work out which documents of a chunk were inserted when insert_many raised a BulkWriteError.
+
+    Parameters:
+    chunk (List[dict]): The documents passed to insert_many.
+    error (BulkWriteError): The error insert_many raised.
+    ordered (bool): Whether the insert was ordered.
+
+    Returns:
+    List[dict]: The documents of the chunk that made it into the collection.
+    """
+    if ordered:
+        return chunk[:error.details.get("nInserted", 0)]
+    failed = {write_error["index"] for write_error in error.details.get("writeErrors", [])}
+    return [document for index, document in enumerate(chunk) if index not in failed]
@@ -0,0 +1,131 @@
+from typing import Any, Dict, List, TYPE_CHECKING
+from dataclasses import dataclass, field
+from bson import ObjectId
+from pymongo import UpdateOne, DeleteOne
+from pymongo.results import BulkWriteResult
+from .utils import merge_update, update_keys
+
+if TYPE_CHECKING:
+    from .mongodriver import Driver, Document
+
+
+@dataclass
+class Session:
+    """
+    A unit of work for a Driver.
+    Records the changes made to Documents while it is active and sends them as bulk_write calls,
+    with one UpdateOne per changed Document, when the session exits or when flush() is called.
+    """
+    driver: "Driver" = field(repr=False)
+    ordered: bool = True
+    chunk_size: int = 1000
+    _pending: Dict[ObjectId, dict] = field(repr=False, default_factory=dict)
+    _deleted: Dict[ObjectId, None] = field(repr=False, default_factory=dict)
+    # the Documents, and their keys, whose recorded changes are the values they hold when the session is flushed
+    _unmerged: Dict[ObjectId, tuple] = field(repr=False, default_factory=dict)
+    _previous: "Session | None" = field(repr=False, default=None)
+
+    def __post_init__(self):
+        if self.chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+    def __enter__(self) -> "Session":
+        self._previous = self.driver.active_session
+        self.driver._local.session = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.driver._local.session = self._previous
+        self._previous = None
+        if exc_type is None:
+            self.flush()
+        else:
+            # the block failed, so nothing it recorded is sent
+            self.clear()
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._deleted)
+
+    def record(self, document: "Document", update: dict):
+        """
+        Record an update for a Document, merging it with the changes already recorded for it.
+        Keys whose changes cannot be merged are sent with the values the Document holds when the session is flushed.
+
+        Parameters:
+        document (Document): The Document being changed.
+        update (dict): A MongoDB update document.
+        """
+        doc_id = ObjectId(document._id)
+        pending = self._pending.setdefault(doc_id, {})
+        if not merge_update(pending, update):
+            # e.g. $inc after $push on the same key: send the value the changes lead to instead,
+            # which the Document may only hold once the write has been recorded
+            fields = self._unmerged.setdefault(doc_id, (document, set()))[1]
+            fields.update(key.split(".")[0] for key in update_keys(update))
+            self._set_values(pending, document, fields)
+
+    @staticmethod
+    def _set_values(pending: dict, document: "Document", fields: set):
+        merge_update(pending, {"$set": {key: document.variables[key] for key in fields if key in document.variables}})
+        merge_update(pending, {"$unset": {key: "" for key in fields if key not in document.variables}})
+
+    def record_delete(self, document: "Document"):
+        """
+        Record the removal of a Document. Any changes recorded for it are dropped.
+
+        Parameters:
+        document (Document): The Document being removed.
+        """
+        doc_id = ObjectId(document._id)
+        self._pending.pop(doc_id, None)
+        self._unmerged.pop(doc_id, None)
+        self._deleted[doc_id] = None
+
+    def operations(self) -> List[UpdateOne | DeleteOne]:
+        """
+        Build the write operations for everything recorded so far.
+
+        Returns:
+        List[UpdateOne | DeleteOne]: One UpdateOne per changed Document followed by one DeleteOne per removed Document.
+        """
+        for doc_id, (document, fields) in self._unmerged.items():
+            self._set_values(self._pending[doc_id], document, fields)
+        operations: List[Any] = [
+            UpdateOne({"_id": doc_id}, update) for doc_id, update in self._pending.items() if update
+        ]
+        operations.extend(DeleteOne({"_id": doc_id}) for doc_id in self._deleted)
+        return operations
+
+    def flush(self) -> List[BulkWriteResult]:
+        """
+        Send everything recorded so far to the database, chunk_size operations per bulk_write call.
+
+        Returns:
+        List[BulkWriteResult]: The result of each bulk_write call.
+        """
+        operations = self.operations()
+        self._reset()
+        if operations:
+            self.driver._invalidate_queries()
+        results = []
+        for start in range(0, len(operations), self.chunk_size):
+            results.append(
+                self.driver.client.bulk_write(
+                    operations[start:start + self.chunk_size], ordered=self.ordered
+                )
+            )
+        return results
+
+    def clear(self):
+        """
+        Drop everything recorded so far without sending it.
+        The changed Documents are evicted from the driver's caches, since they hold values the database never got.
+        """
+        for doc_id in [*self._pending, *self._deleted]:
+            self.driver._written(doc_id)
+        self._reset()
+
+    def _reset(self):
+        self._pending.clear()
+        self._deleted.clear()
+        self._unmerged.clear()
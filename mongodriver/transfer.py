@@ -0,0 +1,266 @@
+import gzip
+import os
+import struct
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, BinaryIO, Iterator, List
+import pymongo
+from bson import json_util
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+from .utils import chunked
+
+FORMATS = ("jsonl", "bson")
+RAW_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+# the write error code of a duplicate _id
+DUPLICATE_KEY = 11000
+
+
+def _checkpoint_path(path: str, kind: str) -> str:
+    return f"{path}.{kind}-checkpoint"
+
+
+def _read_checkpoint(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json_util.loads(file.read())
+
+
+def _write_checkpoint(path: str, state: dict):
+    """
+    Replace the checkpoint atomically, so a crash leaves either the old or the new one.
+    """
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as file:
+        file.write(json_util.dumps(state))
+    os.replace(temporary, path)
+
+
+def format_of(path: str) -> str:
+    """
+    The format of a file by its name: .bson or .bson.gz files are BSON, anything else JSON lines.
+    """
+    name = path[:-3] if path.endswith(".gz") else path
+    return "bson" if name.endswith(".bson") else "jsonl"
+
+
+def export_collection(
+        collection: Any,
+        path: str,
+        search_terms: dict | None = None,
+        format: str = "jsonl",
+        compress: bool = False,
+        batch_size: int = 1000,
+        resume: bool = False,
+) -> int:
+    """
+    Stream the documents that match the search terms to a file, one batch at a time, in _id order.
+
+    jsonl files hold one document per line as canonical extended JSON, so ObjectIds, dates and number types
+    survive the round trip. bson files hold the documents as the server sent them, back to back, like mongodump.
+    BSON documents are never decoded. With compress, every batch is written as one gzip member, which gzip tools
+    read as one stream.
+
+    After every batch the file is flushed and a checkpoint next to it records the last _id and file size.
+    With resume, an export that stopped part way continues after that _id. The checkpoint is removed at the end.
+
+    Parameters:
+    collection (Any): The pymongo Collection.
+    path (str): The file to write.
+    search_terms (dict, optional): A dictionary of search terms to filter the documents.
+    format (str, optional): "jsonl" or "bson".
+    compress (bool, optional): Whether to gzip the file.
+    batch_size (int, optional): The number of documents fetched per round trip and written at once.
+    resume (bool, optional): Whether to continue from the checkpoint of an earlier export, if there is one.
+
+    Returns:
+    int: The number of documents in the file.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    search_terms = search_terms or {}
+    checkpoint_path = _checkpoint_path(path, "export")
+    checkpoint = _read_checkpoint(checkpoint_path) if resume else None
+    if checkpoint is not None and (checkpoint["format"], checkpoint["compress"]) != (format, compress):
+        raise ValueError(f"the checkpoint of {path} was made for another format or compression")
+    query = search_terms
+    if checkpoint is not None:
+        after = {"_id": {"$gt": checkpoint["last_id"]}}
+        query = {"$and": [search_terms, after]} if search_terms else after
+    count = checkpoint["count"] if checkpoint is not None else 0
+    if format == "bson":
+        collection = collection.with_options(codec_options=RAW_OPTIONS)
+    cursor = collection.find(query, sort=[("_id", pymongo.ASCENDING)], batch_size=batch_size)
+    with open(path, "r+b" if checkpoint is not None else "wb") as file:
+        if checkpoint is not None:
+            # anything written after the checkpoint is written again
+            file.truncate(checkpoint["size"])
+            file.seek(checkpoint["size"])
+        try:
+            for batch in chunked(cursor, batch_size):
+                if format == "bson":
+                    data = b"".join(document.raw for document in batch)
+                else:
+                    data = "".join(
+                        json_util.dumps(document, json_options=json_util.CANONICAL_JSON_OPTIONS) + "\n"
+                        for document in batch
+                    ).encode("utf-8")
+                file.write(gzip.compress(data) if compress else data)
+                file.flush()
+                os.fsync(file.fileno())
+                count += len(batch)
+                _write_checkpoint(checkpoint_path, {
+                    "format": format,
+                    "compress": compress,
+                    "last_id": batch[-1]["_id"],
+                    "count": count,
+                    "size": file.tell(),
+                })
+        finally:
+            cursor.close()
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return count
+
+
+def _open(path: str) -> BinaryIO:
+    file = open(path, "rb")
+    magic = file.read(2)
+    file.seek(0)
+    if magic == b"\x1f\x8b":
+        return gzip.GzipFile(fileobj=file)
+    return file
+
+
+def _iter_bson(file: BinaryIO, skip: int) -> Iterator[RawBSONDocument]:
+    index = 0
+    while True:
+        header = file.read(4)
+        if not header:
+            return
+        size = struct.unpack("<i", header)[0]
+        if index < skip:
+            file.seek(size - 4, os.SEEK_CUR)
+        else:
+            data = header + file.read(size - 4)
+            if len(data) != size:
+                raise ValueError("the BSON file ends in the middle of a document")
+            yield RawBSONDocument(data)
+        index += 1
+
+
+def iter_file(path: str, format: str | None = None, skip: int = 0) -> Iterator[Any]:
+    """
+    Stream the documents of a file written by export_collection, compressed or not.
+    BSON documents are returned as RawBSONDocument, which pymongo inserts without encoding them again.
+    The first skip documents are passed over without being decoded.
+    """
+    format = format or format_of(path)
+    if format not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    with _open(path) as file:
+        if format == "bson":
+            yield from _iter_bson(file, skip)
+            return
+        index = 0
+        for line in file:
+            if not line.strip():
+                continue
+            if index >= skip:
+                yield json_util.loads(line)
+            index += 1
+
+
+def _only_duplicates(error: BulkWriteError) -> bool:
+    write_errors = error.details.get("writeErrors", [])
+    return bool(write_errors) and all(write_error.get("code") == DUPLICATE_KEY for write_error in write_errors)
+
+
+def import_collection(
+        collection: Any,
+        path: str,
+        chunk_size: int = 1000,
+        workers: int = 4,
+        upsert: bool = False,
+        resume: bool = False,
+        format: str | None = None,
+) -> int:
+    """
+    Stream a file written by export_collection into a collection, chunk_size documents per insert_many,
+    or per bulk_write of ReplaceOne upserts by _id with upsert. workers chunks are written at the same time,
+    and at most twice as many are read ahead, so memory use does not grow with the size of the file.
+
+    A checkpoint next to the file records how many documents have been written, counting only chunks whose
+    predecessors are all written too. With resume, an import that stopped part way skips those documents.
+    Chunks written after the checkpoint are written again: upserts replace them, and inserts ignore their
+    duplicate _id errors. The checkpoint is removed at the end.
+
+    Parameters:
+    collection (Any): The pymongo Collection.
+    path (str): The file to read.
+    chunk_size (int, optional): The number of documents per write.
+    workers (int, optional): The number of chunks written at the same time.
+    upsert (bool, optional): Whether to replace documents with the same _id instead of inserting.
+    resume (bool, optional): Whether to continue from the checkpoint of an earlier import, if there is one.
+    format (str, optional): "jsonl" or "bson". Defaults to the format of the file name, see format_of().
+
+    Returns:
+    int: The number of documents written by this call.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    checkpoint_path = _checkpoint_path(path, "import")
+    checkpoint = _read_checkpoint(checkpoint_path) if resume else None
+    skip = checkpoint["count"] if checkpoint is not None else 0
+    resuming = checkpoint is not None
+
+    def write(chunk: List[Any]) -> int:
+        try:
+            if upsert:
+                collection.bulk_write(
+                    [ReplaceOne({"_id": document["_id"]}, document, upsert=True) for document in chunk],
+                    ordered=False,
+                )
+            else:
+                collection.insert_many(chunk, ordered=False)
+        except BulkWriteError as error:
+            if not (resuming and _only_duplicates(error)):
+                raise
+        return len(chunk)
+
+    documents = iter_file(path, format, skip)
+    # the size of every written chunk by its index, until the chunks before it are written too
+    done = {}
+    next_index = 0
+    written = skip
+
+    def completed(index: int, size: int):
+        nonlocal next_index, written
+        done[index] = size
+        advanced = False
+        while next_index in done:
+            written += done.pop(next_index)
+            next_index += 1
+            advanced = True
+        if advanced:
+            _write_checkpoint(checkpoint_path, {"count": written})
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        try:
+            for index, chunk in enumerate(chunked(documents, chunk_size)):
+                if len(pending) >= workers * 2:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        completed(pending.pop(future), future.result())
+                pending[executor.submit(write, chunk)] = index
+            for future in list(pending):
+                completed(pending.pop(future), future.result())
+        finally:
+            for future in pending:
+                future.cancel()
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return written - skip
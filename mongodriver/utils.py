@@ -0,0 +1,225 @@
+from itertools import islice
+from typing import Any, Dict, Hashable, Iterable, Iterator, List
+import bson
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+
+def chunked(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Split an iterable into lists of at most size items without reading it all into memory.
+
+    Parameters:
+    iterable (Iterable[Any]): The items to split.
+    size (int): The maximum number of items per chunk.
+
+    Returns:
+    Iterator[List[Any]]: The chunks, in order.
+    """
+    if size < 1:
+        raise ValueError("chunk size must be at least 1")
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def merge_update(pending: Dict[str, dict], update: Dict[str, dict]) -> bool:
+    """
+    Merge an update into the update already waiting to be sent for the same document, in place.
+
+    $set and $unset merge unless a parent path of their key is waiting, and the latest change to a key wins,
+    so {"$set": {"foo": 1}} followed by {"$unset": {"foo": ""}} leaves only the $unset,
+    and {"$set": {"stats": {...}}} replaces a waiting {"$set": {"stats.clicks": 1}}.
+    The other operators merge with a waiting change of the same operator to the same key ($inc amounts are added,
+    $min/$max keep the lowest/highest value, $push/$addToSet $each lists are joined) or when no overlapping key is waiting.
+
+    Parameters:
+    pending (Dict[str, dict]): The waiting update, e.g. {"$set": {"foo": 1}}.
+    update (Dict[str, dict]): The update to merge into it.
+
+    Returns:
+    bool: False if the update could not be merged, in which case pending is left unchanged.
+    """
+    for operator, values in update.items():
+        if operator not in _MERGERS:
+            raise ValueError(f"cannot merge the {operator} operator")
+        for key in values:
+            for other, other_values in pending.items():
+                for other_key in other_values:
+                    if operator in _OVERRIDES:
+                        if key.startswith(other_key + "."):
+                            return False
+                    elif other_key == key:
+                        if other != operator or _MERGERS[operator] is None:
+                            return False
+                    elif _overlaps(key, other_key):
+                        return False
+    for operator, values in update.items():
+        for key, value in values.items():
+            if operator in _OVERRIDES:
+                for other_values in pending.values():
+                    for other_key in [other_key for other_key in other_values if _overlaps(key, other_key)]:
+                        other_values.pop(other_key)
+            target = pending.setdefault(operator, {})
+            merger = _MERGERS[operator]
+            target[key] = merger(target[key], value) if key in target and merger is not None else value
+    for operator in [operator for operator, values in pending.items() if not values]:
+        pending.pop(operator)
+    return True
+
+
+def _overlaps(key: str, other_key: str) -> bool:
+    """
+    Whether two dotted paths are the same or one is inside the other.
+    """
+    return key == other_key or key.startswith(other_key + ".") or other_key.startswith(key + ".")
+
+
+def _join_each(old: dict, new: dict) -> dict:
+    return {"$each": list(old["$each"]) + list(new["$each"])}
+
+
+_OVERRIDES = ("$set", "$unset")
+_MERGERS = {
+    "$set": None,
+    "$unset": None,
+    "$inc": lambda old, new: old + new,
+    "$min": min,
+    "$max": max,
+    "$push": _join_each,
+    "$addToSet": _join_each,
+    "$pull": None,
+}
+
+
+def discard_paths(pending: Dict[str, dict], keys: Iterable[str]) -> Dict[str, dict]:
+    """
+    Remove keys from an update waiting to be sent, in place, e.g. because a newer write for them was sent directly.
+
+    Parameters:
+    pending (Dict[str, dict]): The waiting update.
+    keys (Iterable[str]): The keys to remove.
+
+    Returns:
+    Dict[str, dict]: The remaining update, which is pending itself.
+    """
+    for key in keys:
+        for values in pending.values():
+            values.pop(key, None)
+    for operator in [operator for operator, values in pending.items() if not values]:
+        pending.pop(operator)
+    return pending
+
+
+def update_keys(update: Dict[str, dict]) -> List[str]:
+    """
+    List the keys an update changes.
+    """
+    return [key for values in update.values() for key in values]
+
+
+def fetch_update(collection: Any, doc_id: str | ObjectId, update: Dict[str, dict]) -> dict | None:
+    """
+    Update a document with find_one_and_update and get back only the keys the update changed, as stored after it.
+
+    Parameters:
+    collection (Any): The pymongo Collection.
+    doc_id (str | ObjectId): The _id of the document.
+    update (Dict[str, dict]): The update to apply.
+
+    Returns:
+    dict | None: The changed keys, or None if no document matched.
+    """
+    return collection.find_one_and_update(
+        {"_id": ObjectId(doc_id)},
+        update,
+        projection={key: 1 for key in update_keys(update)},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def diff_update(snapshot: dict, current: dict) -> Dict[str, dict]:
+    """
+    Build the smallest update that turns a snapshot of a document into its current state.
+    Changes inside subdocuments are set by dotted path. Lists that changed are set whole.
+
+    Parameters:
+    snapshot (dict): The document as it was loaded or last saved.
+    current (dict): The document as it is now.
+
+    Returns:
+    Dict[str, dict]: A MongoDB update using $set and $unset, empty if nothing changed.
+    """
+    update = {"$set": {}, "$unset": {}}
+    _diff(snapshot, current, "", update)
+    return {operator: values for operator, values in update.items() if values}
+
+
+def _diff(old: dict, new: dict, prefix: str, update: Dict[str, dict]):
+    for key, value in new.items():
+        path = prefix + str(key)
+        if key not in old:
+            update["$set"][path] = value
+            continue
+        previous = old[key]
+        if type(previous) is type(value) and previous == value:
+            continue
+        if isinstance(previous, dict) and isinstance(value, dict) and value and _path_safe(value) and _path_safe(previous):
+            _diff(previous, value, path + ".", update)
+        else:
+            update["$set"][path] = value
+    for key in old.keys() - new.keys():
+        update["$unset"][prefix + str(key)] = ""
+
+
+def _path_safe(document: dict) -> bool:
+    """
+    Whether every key of a subdocument can be used in a dotted path.
+    """
+    return all(isinstance(key, str) and "." not in key and not key.startswith("$") for key in document)
+
+
+def normalize_projection(projection: dict | List[str] | None) -> dict | None:
+    """
+    Turn a projection given as a list of field names into a dict, and check that it keeps _id,
+    which every Document needs.
+
+    Parameters:
+    projection (dict | List[str] | None): The projection, e.g. {"foo": 1}, {"blob": 0} or ["foo", "bar"].
+
+    Returns:
+    dict | None: The projection as a dict, or None if no projection was given.
+    """
+    if projection is None:
+        return None
+    if not isinstance(projection, dict):
+        projection = {key: 1 for key in projection}
+    if not projection.get("_id", True):
+        raise ValueError("projection cannot exclude _id")
+    return projection
+
+
+def query_key(kind: str, search_terms: dict, projection: dict | None = None, sort: dict | None = None) -> Hashable:
+    """
+    Build the query cache key of a read.
+    The top-level keys of the filter and the keys of the projection are sorted, since their order does not change
+    the result. Values are compared as BSON, so the order inside subdocuments still counts, as it does for the server.
+
+    Parameters:
+    kind (str): The kind of read, e.g. "find".
+    search_terms (dict): The filter of the read.
+    projection (dict, optional): The projection of the read.
+    sort (dict, optional): The sort of the read.
+
+    Returns:
+    Hashable: The key.
+    """
+    return (
+        kind,
+        tuple((key, bson.encode({"v": search_terms[key]})) for key in sorted(search_terms)),
+        tuple(sorted(projection.items())) if projection is not None else None,
+        tuple(sort.items()) if sort is not None else None,
+    )
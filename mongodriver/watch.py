@@ -0,0 +1,330 @@
+import asyncio
+import copy
+import inspect
+import threading
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Set
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+
+
+class LiveDocuments:
+    """
+    Weak references to the Documents a Driver has handed out, by _id, so a change stream can patch them.
+    Documents are not kept alive by being registered.
+    """
+
+    def __init__(self):
+        self._documents: Dict[ObjectId, List[weakref.ReferenceType]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, document: Any):
+        doc_id = ObjectId(document._id)
+        reference = weakref.ref(document, lambda _, doc_id=doc_id: self._collect(doc_id))
+        with self._lock:
+            self._documents.setdefault(doc_id, []).append(reference)
+
+    def _collect(self, doc_id: ObjectId):
+        with self._lock:
+            references = [reference for reference in self._documents.get(doc_id, ()) if reference() is not None]
+            if references:
+                self._documents[doc_id] = references
+            else:
+                self._documents.pop(doc_id, None)
+
+    def get(self, doc_id: Any) -> List[Any]:
+        """
+        The live Documents with an _id.
+        """
+        with self._lock:
+            references = list(self._documents.get(doc_id, ()))
+        return [document for document in (reference() for reference in references) if document is not None]
+
+
+def _container(document: dict, keys: List[str]) -> Any:
+    """
+    Walk down to the subdocument or list that holds the last key of a path, or None if the path is not there.
+    """
+    value = document
+    for key in keys[:-1]:
+        try:
+            value = value[int(key)] if isinstance(value, list) else value[key]
+        except (KeyError, IndexError, ValueError, TypeError):
+            return None
+    return value if isinstance(value, (dict, list)) else None
+
+
+def _set_path(document: dict, path: str, value: Any) -> bool:
+    keys = path.split(".")
+    container = _container(document, keys)
+    if isinstance(container, dict):
+        container[keys[-1]] = value
+        return True
+    if isinstance(container, list) and keys[-1].isdigit():
+        index = int(keys[-1])
+        if index < len(container):
+            container[index] = value
+        elif index == len(container):
+            container.append(value)
+        else:
+            return False
+        return True
+    return False
+
+
+def _unset_path(document: dict, path: str) -> bool:
+    keys = path.split(".")
+    container = _container(document, keys)
+    if isinstance(container, dict) and keys[-1] in container:
+        del container[keys[-1]]
+        return True
+    return False
+
+
+def apply_change(variables: dict, event: dict) -> Set[str]:
+    """
+    Apply an update or replace change event to the variables of a Document, in place.
+    Nested changes to a field the document does not hold, e.g. because a projection left it out, are skipped,
+    since the rest of that field is unknown.
+
+    Parameters:
+    variables (dict): The variables of the Document.
+    event (dict): The change event.
+
+    Returns:
+    Set[str]: The top-level keys that changed.
+    """
+    operation = event.get("operationType")
+    if operation == "replace":
+        document = dict(event["fullDocument"])
+        document.pop("_id", None)
+        changed = set(variables) | set(document)
+        for key in [key for key in variables if key not in document]:
+            del variables[key]
+        variables.update(copy.deepcopy(document))
+        return changed
+    if operation != "update":
+        return set()
+    description = event.get("updateDescription", {})
+    changed = set()
+    for path, value in description.get("updatedFields", {}).items():
+        key = path.split(".")[0]
+        if key == path:
+            variables[key] = copy.deepcopy(value)
+            changed.add(key)
+        elif key in variables and _set_path(variables, path, copy.deepcopy(value)):
+            changed.add(key)
+    for path in description.get("removedFields", []):
+        key = path.split(".")[0]
+        if key == path:
+            if key in variables:
+                del variables[key]
+                changed.add(key)
+        elif key in variables and _unset_path(variables, path):
+            changed.add(key)
+    for truncated in description.get("truncatedArrays", []):
+        keys = truncated["field"].split(".")
+        container = _container(variables, keys + [""])
+        if isinstance(container, list):
+            del container[truncated["newSize"]:]
+            changed.add(keys[0])
+    return changed
+
+
+class ChangeWatcher:
+    """
+    Follows a change stream in a background thread, passing each change event to the Driver and then to the callbacks.
+
+    The stream is reopened after a server error, resuming after the last event seen, and the error is kept in errors.
+    Errors raised by callbacks are kept in errors too and do not stop the watcher.
+    """
+
+    def __init__(
+            self,
+            open_stream: Callable[[Any], Any],
+            handle: Callable[[dict], None],
+            callbacks: Iterable[Callable[[dict], Any]] = (),
+            retry_interval: float = 1.0,
+    ):
+        self.callbacks = list(callbacks)
+        self.errors: List[Exception] = []
+        self.resume_token: Any = None
+        self.retry_interval = retry_interval
+        self._open_stream = open_stream
+        self._handle = handle
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="mongodriver-watch", daemon=True)
+
+    def __enter__(self) -> "ChangeWatcher":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def on_change(self, callback: Callable[[dict], Any]) -> Callable[[dict], Any]:
+        """
+        Add a callback, called with every change event. Can be used as a decorator.
+        """
+        self.callbacks.append(callback)
+        return callback
+
+    def start(self) -> "ChangeWatcher":
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                stream = self._open_stream(self.resume_token)
+                try:
+                    self._follow(stream)
+                finally:
+                    if hasattr(stream, "close"):
+                        stream.close()
+                if not hasattr(stream, "try_next"):
+                    # a plain iterable of events ends when it is exhausted
+                    return
+            except PyMongoError as error:
+                self.errors.append(error)
+                self._stopped.wait(self.retry_interval)
+
+    def _follow(self, stream: Any):
+        if hasattr(stream, "try_next"):
+            while not self._stopped.is_set():
+                event = stream.try_next()
+                if event is not None:
+                    self._dispatch(event)
+            return
+        for event in stream:
+            if self._stopped.is_set():
+                return
+            self._dispatch(event)
+
+    def _dispatch(self, event: dict):
+        self.resume_token = event.get("_id", self.resume_token)
+        for handle in [self._handle] + self.callbacks:
+            try:
+                handle(event)
+            except Exception as error:
+                self.errors.append(error)
+
+    def join(self, timeout: float | None = None):
+        """
+        Wait for the watcher to end, e.g. after an event source given to watch() was exhausted.
+        """
+        self._thread.join(timeout)
+
+    def stop(self, timeout: float | None = None):
+        """
+        Stop following the change stream and wait for the background thread to end.
+        """
+        self._stopped.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+
+class AsyncChangeWatcher:
+    """FOLLOWS A CHANGE STREAM IN A BACKGROUND TASK
+    each change event is passed to the AsyncDriver and then to the callbacks, which can be coroutine functions
+    the stream is reopened after a server error, resuming after the last event seen
+    errors raised by the stream or by callbacks are kept in errors
+    """
+
+    def __init__(
+            self,
+            open_stream: Callable[[Any], Any],
+            handle: Callable[[dict], None],
+            callbacks: Iterable[Callable[[dict], Any]] = (),
+            retry_interval: float = 1.0,
+    ):
+        self.callbacks = list(callbacks)
+        self.errors: List[Exception] = []
+        self.resume_token: Any = None
+        self.retry_interval = retry_interval
+        self._open_stream = open_stream
+        self._handle = handle
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> "AsyncChangeWatcher":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def on_change(self, callback: Callable[[dict], Any]) -> Callable[[dict], Any]:
+        """ADDS A CALLBACK, CALLED WITH EVERY CHANGE EVENT"""
+        self.callbacks.append(callback)
+        return callback
+
+    def start(self) -> "AsyncChangeWatcher":
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def _run(self):
+        while True:
+            try:
+                stream = self._open_stream(self.resume_token)
+                try:
+                    await self._follow(stream)
+                finally:
+                    if hasattr(stream, "close"):
+                        closed = stream.close()
+                        if inspect.isawaitable(closed):
+                            await closed
+                if not hasattr(stream, "try_next"):
+                    return
+            except PyMongoError as error:
+                self.errors.append(error)
+                await asyncio.sleep(self.retry_interval)
+
+    async def _follow(self, stream: Any):
+        if hasattr(stream, "try_next"):
+            while True:
+                event = await stream.try_next()
+                if event is not None:
+                    await self._dispatch(event)
+                else:
+                    # try_next returns None right away when no event is waiting
+                    await asyncio.sleep(0)
+        elif hasattr(stream, "__aiter__"):
+            async for event in stream:
+                await self._dispatch(event)
+        else:
+            for event in stream:
+                await self._dispatch(event)
+
+    async def _dispatch(self, event: dict):
+        self.resume_token = event.get("_id", self.resume_token)
+        for handle in [self._handle] + self.callbacks:
+            try:
+                result = handle(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as error:
+                self.errors.append(error)
+
+    async def join(self):
+        """WAITS FOR THE WATCHER TO END, E.G. AFTER AN EVENT SOURCE GIVEN TO watch() WAS EXHAUSTED"""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def stop(self):
+        """STOPS FOLLOWING THE CHANGE STREAM"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,155 @@
+import asyncio
+from itertools import islice
+from typing import Any, Dict, Iterable, List
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.results import BulkWriteResult
+from .utils import merge_update, discard_paths
+
+
+class WriteBehindQueue:
+    """
+    Collects the attribute writes of an AsyncDriver's Documents and sends them in the background.
+
+    Writes to the same document are merged into one update, so a field assigned many times between two drains
+    costs a single $set. A background task drains the queue interval seconds after the first queued write,
+    or right away once batch_size documents are waiting, with one bulk_write call per batch_size documents.
+
+    The queue is over its high-water mark when high_water_mark documents are waiting.
+    Producers that write in a loop should await wait_for_capacity() to slow down until the queue has drained.
+    A drain that is waiting for interval to pass starts right away once a batch is full, which it always is
+    over the high-water mark.
+
+    Errors raised by background drains are kept and raised by the next flush().
+    """
+
+    def __init__(
+            self,
+            client: Any,
+            batch_size: int = 1000,
+            interval: float = 0.1,
+            high_water_mark: int = 10_000,
+            ordered: bool = False,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if high_water_mark < batch_size:
+            raise ValueError("high_water_mark cannot be lower than batch_size")
+        self.client = client
+        self.batch_size = batch_size
+        self.interval = interval
+        self.high_water_mark = high_water_mark
+        self.ordered = ordered
+        self.errors: List[Exception] = []
+        self._pending: Dict[ObjectId, dict] = {}
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        # set when batch_size documents are waiting, to cut the wait for more writes short
+        self._full = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def over_high_water_mark(self) -> bool:
+        return len(self._pending) >= self.high_water_mark
+
+    def put(self, doc_id: str | ObjectId, update: dict):
+        """
+        Queue an update for a document. Must be called from a running event loop.
+
+        Parameters:
+        doc_id (str | ObjectId): The _id of the document.
+        update (dict): A MongoDB update document using $set and/or $unset.
+        """
+        merge_update(self._pending.setdefault(ObjectId(doc_id), {}), update)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        self._wakeup.set()
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+
+    async def discard(self, doc_id: str | ObjectId, keys: Iterable[str] | None = None):
+        """
+        Drop queued changes of a document, e.g. because a newer value is about to be written directly.
+        Waits for a drain that is already sending them, so they cannot land after the direct write.
+
+        Parameters:
+        doc_id (str | ObjectId): The _id of the document.
+        keys (Iterable[str], optional): The keys to drop. Every queued change of the document is dropped when not given.
+        """
+        doc_id = ObjectId(doc_id)
+        async with self._lock:
+            if doc_id not in self._pending:
+                return
+            if keys is None or not discard_paths(self._pending[doc_id], keys):
+                del self._pending[doc_id]
+
+    async def flush_document(self, doc_id: str | ObjectId):
+        """
+        Send the queued changes of one document now, e.g. before an $inc that has to apply on top of them.
+
+        Parameters:
+        doc_id (str | ObjectId): The _id of the document.
+        """
+        doc_id = ObjectId(doc_id)
+        async with self._lock:
+            update = self._pending.pop(doc_id, None)
+            if update:
+                await self.client.update_one({"_id": doc_id}, update)
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if len(self._pending) < self.batch_size:
+                # give more writes a chance to be merged into this drain, until a batch is full
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+            try:
+                await self._drain()
+            except Exception as error:
+                self.errors.append(error)
+
+    async def _drain(self) -> List[BulkWriteResult]:
+        results = []
+        async with self._lock:
+            while self._pending:
+                batch = [
+                    UpdateOne({"_id": doc_id}, self._pending.pop(doc_id))
+                    for doc_id in list(islice(self._pending, self.batch_size))
+                ]
+                results.append(await self.client.bulk_write(batch, ordered=self.ordered))
+        return results
+
+    async def flush(self) -> List[BulkWriteResult]:
+        """
+        Send every queued write now.
+
+        Returns:
+        List[BulkWriteResult]: The result of each bulk_write call.
+        """
+        results = await self._drain()
+        if self.errors:
+            error, self.errors = self.errors[0], []
+            raise error
+        return results
+
+    async def wait_for_capacity(self):
+        """
+        Wait until the queue is below its high-water mark, draining it if needed.
+        """
+        if self.over_high_water_mark:
+            await self._drain()
+
+    def close(self):
+        """
+        Stop the background task. Writes still queued are dropped, so flush() first.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
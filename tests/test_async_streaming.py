@@ -0,0 +1,154 @@
+"""
+Streaming reads of the AsyncDriver. Runs without a database: the driver is given a Motor-style stand-in client whose
+cursors hand out documents one at a time and record whether they were closed.
+"""
+import asyncio
+from contextlib import aclosing
+from bson import ObjectId
+from mongodriver import AsyncDriver
+
+
+class StandInCursor:
+    """
+    An AsyncIOMotorCursor over a list: async iteration, to_list(length) and close().
+    """
+
+    def __init__(self, documents: list, batch_size: int = 0):
+        self._documents = iter(documents)
+        self.batch_size = batch_size
+        self.read = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        await asyncio.sleep(0)
+        if self.closed:
+            raise StopAsyncIteration
+        try:
+            document = next(self._documents)
+        except StopIteration:
+            raise StopAsyncIteration
+        self.read += 1
+        return document
+
+    async def to_list(self, length: int | None = None) -> list:
+        documents = []
+        async for document in self:
+            documents.append(document)
+            if length is not None and len(documents) >= length:
+                break
+        return documents
+
+    async def close(self):
+        self.closed = True
+
+
+class StandInCollection:
+    """
+    An AsyncIOMotorCollection that only supports find, with equality filters and inclusion projections.
+    Every cursor it hands out is kept in cursors.
+    """
+
+    def __init__(self, documents: list):
+        self.documents = documents
+        self.cursors = []
+
+    def find(self, search_terms=None, projection=None, sort=None, limit=0, batch_size=0) -> StandInCursor:
+        documents = [
+            dict(document) for document in self.documents
+            if all(document.get(key) == value for key, value in (search_terms or {}).items())
+        ]
+        for key, direction in reversed(sort or []):
+            documents.sort(key=lambda document: document[key], reverse=direction == -1)
+        if limit:
+            documents = documents[:limit]
+        if projection:
+            documents = [
+                {key: value for key, value in document.items() if key == "_id" or projection.get(key)}
+                for document in documents
+            ]
+        cursor = StandInCursor(documents, batch_size)
+        self.cursors.append(cursor)
+        return cursor
+
+
+def _driver(count: int = 10) -> AsyncDriver:
+    collection = StandInCollection([{"_id": ObjectId(), "i": i, "even": i % 2 == 0} for i in range(count)])
+    return AsyncDriver(
+        connection_url="mongodb://localhost", db_name="db", collection_name="users",
+        mongo_client={"db": {"users": collection}},
+    )
+
+
+def test_iter_find_streams_documents():
+    async def run():
+        driver = _driver()
+        documents = driver.iter_find({"even": True}, batch_size=2, sort={"i": -1}, projection=["i"])
+        first = await anext(documents)
+        cursor = driver.client.cursors[0]
+        # documents are built while the cursor is read, not after reading all of it
+        assert cursor.read == 1 and cursor.batch_size == 2
+        rest = [document async for document in documents]
+        assert [document.i.value for document in [first, *rest]] == [8, 6, 4, 2, 0]
+        assert first.variables == {"i": 8}
+        assert cursor.closed
+
+    asyncio.run(run())
+
+
+def test_iter_load_streams_every_document():
+    async def run():
+        driver = _driver()
+        assert [document.i.value async for document in driver.iter_load(batch_size=3)] == list(range(10))
+        assert driver.client.cursors[0].closed
+
+    asyncio.run(run())
+
+
+def test_find_and_load_read_at_most_length_documents():
+    async def run():
+        driver = _driver()
+        assert [document.i.value for document in await driver.find({"even": False}, 2)] == [1, 3]
+        assert len(await driver.find({"even": False})) == 5
+        assert len(await driver.load(4)) == 4
+        assert len(await driver.load()) == 10
+        assert all(cursor.closed for cursor in driver.client.cursors)
+
+    asyncio.run(run())
+
+
+def test_cursor_closed_when_loop_exits_early():
+    async def run():
+        driver = _driver()
+        async with aclosing(driver.iter_find({})) as documents:
+            async for document in documents:
+                if document.i.value == 2:
+                    break
+        cursor = driver.client.cursors[0]
+        assert cursor.closed and cursor.read == 3
+
+        # without aclosing, the generator is closed once it is garbage collected after the loop
+        async for document in driver.iter_find({}):
+            break
+        for _ in range(3):
+            # the event loop closes it in a task of its own
+            await asyncio.sleep(0)
+        assert driver.client.cursors[1].closed
+
+    asyncio.run(run())
+
+
+def test_cursor_closed_when_loop_raises():
+    async def run():
+        driver = _driver()
+        try:
+            async with aclosing(driver.iter_find({})) as documents:
+                async for document in documents:
+                    raise KeyError(document.i.value)
+        except KeyError:
+            pass
+        assert driver.client.cursors[0].closed
+
+    asyncio.run(run())
@@ -0,0 +1,77 @@
+"""
+Keyset pagination over documents with a null or missing sort key. Runs without a database: the filters built by
+keyset_query are evaluated with MongoDB's comparison rules, where range operators only match values of the same type.
+"""
+from bson import ObjectId
+from mongodriver.pagination import encode_token, keyset_query
+
+
+def _compare(value, operator, bound) -> bool:
+    if operator == "$ne":
+        return value != bound
+    if value is None or bound is None or type(value) is not type(bound):
+        # type bracketing: {"$gt": None} or {"$lt": 5} never match a value of another type
+        return False
+    return value > bound if operator == "$gt" else value < bound
+
+
+def _matches(document: dict, search_terms: dict) -> bool:
+    for key, condition in search_terms.items():
+        if key == "$or":
+            if not any(_matches(document, branch) for branch in condition):
+                return False
+        elif key == "$and":
+            if not all(_matches(document, branch) for branch in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not all(_compare(document.get(key), operator, bound) for operator, bound in condition.items()):
+                return False
+        elif document.get(key) != condition:
+            return False
+    return True
+
+
+def _sort_key(document: dict, sort_key: str):
+    # null and missing values sort before numbers
+    value = document.get(sort_key)
+    return (value is not None, value if value is not None else 0, document["_id"])
+
+
+def _paginate(documents: list, sort_key: str, page_size: int, descending: bool = False) -> list:
+    seen = []
+    after = None
+    while True:
+        query, _ = keyset_query({}, sort_key, after, descending)
+        page = sorted(
+            (document for document in documents if _matches(document, query)),
+            key=lambda document: _sort_key(document, sort_key),
+            reverse=descending,
+        )[:page_size + 1]
+        seen.extend(page[:page_size])
+        if len(page) <= page_size:
+            return seen
+        after = encode_token(page[page_size - 1], sort_key)
+
+
+def _documents() -> list:
+    documents = [{"_id": ObjectId()} for _ in range(2)]
+    documents.append({"_id": ObjectId(), "n": None})
+    documents.extend({"_id": ObjectId(), "n": n} for n in range(5))
+    return documents
+
+
+def test_missing_sort_key_ascending():
+    documents = _documents()
+    for page_size in (1, 2, 3, 10):
+        pages = _paginate(documents, "n", page_size)
+        assert [document["_id"] for document in pages] == [
+            document["_id"] for document in sorted(documents, key=lambda document: _sort_key(document, "n"))
+        ]
+
+
+def test_missing_sort_key_descending():
+    documents = _documents()
+    for page_size in (1, 2, 3, 10):
+        pages = _paginate(documents, "n", page_size, descending=True)
+        assert len(pages) == len(documents)
+        assert [document.get("n") for document in pages][:5] == [4, 3, 2, 1, 0]